@@ -0,0 +1,1782 @@
+"""课程数据分析核心：数据清洗、加载缓存、索引与汇总统计
+
+不依赖 Streamlit 和 Plotly，可被仪表盘、命令行预计算脚本和基准测试直接导入。
+openpyxl 和 pyarrow 只在读写工作簿、映射数据集时导入，不计入导入本模块的耗时。
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import fnmatch
+import functools
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+
+# 性能分析：由调用方通过 use_profiler 为当前线程挂上 RerunProfiler，未挂载时各区段不做任何事
+_profile_state = threading.local()
+
+
+class RerunProfiler:
+    """记录一次脚本重跑中各区段（可嵌套）的耗时和内存峰值
+
+    tracemalloc 是进程级的，多个会话同时开启内存分析时数据会互相干扰，仅用于诊断。
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+        self._stack = []
+        self._owns_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        """计时一个区段；内存模式下记录区段内相对起点的分配峰值（含嵌套区段）"""
+        frame = {'name': name, 'depth': len(self._stack), 'start': time.perf_counter()}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = frame['peak'] = current
+        record = {'name': name, 'depth': frame['depth']}
+        self.records.append(record)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            record['ms'] = (time.perf_counter() - frame['start']) * 1000
+            if self.memory:
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_kb'] = (frame['peak'] - frame['base']) / 1024
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+
+    def finish(self):
+        """结束本次重跑，返回可写入 JSON 的记录"""
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        return {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'total_ms': (time.perf_counter() - self.started) * 1000,
+            'sections': self.records,
+        }
+
+
+@contextmanager
+def use_profiler(profiler):
+    """在当前线程内启用性能记录，退出时卸下"""
+    _profile_state.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _profile_state.profiler = None
+
+
+@contextmanager
+def profile_section(name):
+    """在当前重跑的性能记录中计时一个区段；未开启性能分析时不做任何事"""
+    profiler = getattr(_profile_state, 'profiler', None)
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
+
+
+def profiled(func):
+    """将函数调用记录为一个性能分析区段"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile_section(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# 数据处理函数
+# "40/60" 这类权重文本：平时权重/期末权重；\d 与 int() 一致，也接受全角数字（如 "４０/６０"）
+WEIGHT_PATTERN = r'^\s*([+-]?\d+)\s*/\s*([+-]?\d+)\s*$'
+WEIGHT_MISSING_VALUES = ['0', '无', '']
+DEFAULT_WEIGHT = 50
+WEIGHT_STATUS = ['已解析', '缺失', '无法解析']
+NUMERIC_COLS = ['学分', '学时', '课堂规模']
+# 紧凑列类型：是/否字段存为 numpy bool，低基数文本存为 Categorical
+FLAG_COLS = ['是否翻转课堂', '是否有软件实操', '是否有开题报告', '是否有答辩']
+FLAG_TRUE_VALUES = ['是', '有', 'yes', 'Yes']
+FLAG_LABELS = {True: '是', False: '否'}
+CATEGORY_COLS = ['高校名称', '教学模式', '面向层次', '来源工作表', '来源文件']
+
+
+def parse_weights(weights):
+    """向量化解析权重文本，一次得到平时权重、期末权重和解析状态"""
+    # 权重写法只有少数几种：先对去重后的取值做正则提取，再按编码广播回所有行
+    codes, uniques = pd.factorize(weights)
+    text = pd.Series(uniques, dtype=object).astype('string').str.strip()
+    parts = text.str.extract(WEIGHT_PATTERN)
+    # pd.to_numeric 不识别全角数字，按 int() 逐个转换；去重后的取值很少，开销可以忽略
+    usual = pd.to_numeric(parts[0].map(int, na_action='ignore'), errors='coerce')
+    final = pd.to_numeric(parts[1].map(int, na_action='ignore'), errors='coerce')
+
+    parsed = (usual.notna() & final.notna()).to_numpy(dtype=bool)
+    missing = text.isin(WEIGHT_MISSING_VALUES).to_numpy(dtype=bool)
+
+    # 缺失或无法解析的权重使用默认值；末尾追加一项对应空值（编码 -1）
+    usual = np.append(usual.where(parsed, DEFAULT_WEIGHT).to_numpy(dtype='int64'), DEFAULT_WEIGHT)
+    final = np.append(final.where(parsed, DEFAULT_WEIGHT).to_numpy(dtype='int64'), DEFAULT_WEIGHT)
+    status = np.append(np.select([parsed, missing], [0, 1], default=2), 1).astype('int8')
+
+    return pd.DataFrame({
+        '平时权重': usual[codes],
+        '期末权重': final[codes],
+        '权重解析状态': pd.Categorical.from_codes(status[codes], categories=WEIGHT_STATUS),
+    }, index=weights.index)
+
+
+def clean_rows(df):
+    """逐行独立的清洗步骤，不依赖整列统计量，可以分块执行"""
+    # 浅复制：只替换列而不修改原数据的列数组，不必复制整张表
+    df_clean = df.copy(deep=False)
+
+    # 1. 处理数值字段
+    for col in NUMERIC_COLS:
+        if col in df_clean.columns:
+            # 转换数据类型，处理空值和特殊值
+            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+
+    # 2. 处理权重字段（基于你的数据特点）
+    if '平时/期末权重' in df_clean.columns:
+        weights = parse_weights(df_clean['平时/期末权重'])
+        for col in weights.columns:
+            df_clean[col] = weights[col]
+
+    # 3. 处理布尔字段：是/有/yes 为 True，其余（否、无、空值等）为 False
+    for col in FLAG_COLS:
+        if col in df_clean.columns:
+            flags = df_clean[col].astype('string').str.strip().isin(FLAG_TRUE_VALUES)
+            df_clean[col] = flags.to_numpy(dtype=bool)
+
+    # 4. 处理文本字段
+    text_cols = ['特色做法', '核心教材', '软件工具', '考核内容']
+    for col in text_cols:
+        if col in df_clean.columns:
+            df_clean[col] = df_clean[col].fillna('未提供')
+            # 替换0为"未提供"
+            df_clean[col] = df_clean[col].replace({'0': '未提供', '无': '未提供'})
+
+    # 5. 分类字段处理
+    categorical_cols = ['教学模式', '面向层次']
+    for col in categorical_cols:
+        if col in df_clean.columns:
+            df_clean[col] = df_clean[col].fillna('未知')
+
+    return df_clean
+
+
+def finalize_columns(df_clean):
+    """依赖整列统计量的步骤：中位数填充和学时分层"""
+    for col in NUMERIC_COLS:
+        if col in df_clean.columns:
+            # 用中位数填充缺失值
+            median_val = df_clean[col].median() if not df_clean[col].isna().all() else 0
+            df_clean[col] = df_clean[col].fillna(median_val)
+
+    # 6. 创建学时分层
+    if '学时' in df_clean.columns:
+        df_clean['学时分层'] = hour_bands(df_clean['学时'])
+
+    return compact_dtypes(df_clean)
+
+
+def hour_bands(hours):
+    """按学时分层，只依赖每行自身的学时"""
+    return pd.cut(
+        hours,
+        bins=[0, 32, 48, 100],
+        labels=['短学时(≤32)', '中学时(33-48)', '长学时(>48)'],
+        right=False
+    )
+
+
+def compact_dtypes(df):
+    """压缩列类型：低基数文本转为 Categorical，整数值的数值列转为最小宽度整数"""
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category').cat.remove_unused_categories()
+
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            values = df[col]
+            if values.notna().all() and (values == values.round()).all():
+                df[col] = pd.to_numeric(values, downcast='integer')
+
+    return df
+
+
+def to_display_labels(df):
+    """将布尔字段还原为“是/否”标签，用于表格展示和导出"""
+    flag_cols = [col for col in FLAG_COLS if col in df.columns]
+    if not flag_cols:
+        return df
+    return df.assign(**{col: df[col].map(FLAG_LABELS) for col in flag_cols})
+
+
+def preprocess_data(df):
+    """根据你的数据特点进行预处理"""
+    return finalize_columns(clean_rows(df))
+
+
+# 数据文件与磁盘缓存配置
+DATA_FILE = os.environ.get('COURSE_DATA_FILE', "双一流高校课程开设情况.xlsx")
+CACHE_DIR = ".cache"
+# 预处理规则版本：修改 preprocess_data 的清洗逻辑时递增，使旧的磁盘缓存失效
+PREPROCESS_VERSION = 6
+# 读取的工作表：逗号分隔的通配模式，如 "*" 合并全部工作表、"*大学" 只读按高校拆分的工作表
+SHEET_PATTERNS = os.environ.get('COURSE_SHEETS', 'Sheet1')
+# 超过该大小（MB）或需要合并多个工作表时改用只读流式读取
+STREAM_THRESHOLD_MB = float(os.environ.get('COURSE_STREAM_THRESHOLD_MB', '5'))
+STREAM_CHUNK_ROWS = 5000
+# 判断工作表是否为课程数据的必需列
+REQUIRED_COLS = ['高校名称', '课程名']
+
+
+def workbook_stat(path):
+    """返回工作簿的 (绝对路径, 修改时间, 文件大小)，用于廉价的变更检测"""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _source_key(path, sheet_patterns):
+    """数据源标识：工作簿绝对路径 + 工作表选择"""
+    return hashlib.sha256(f"{os.path.abspath(path)}|{sheet_patterns}".encode('utf-8')).hexdigest()[:12]
+
+
+def _workbook_key(path):
+    """根据修改时间、大小、内容哈希和预处理版本计算工作簿版本，与快照记录的版本一致时直接复用"""
+    _, mtime, size = workbook_stat(path)
+    content_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            content_hash.update(block)
+
+    return hashlib.sha256(
+        f"{mtime}|{size}|{content_hash.hexdigest()}|v{PREPROCESS_VERSION}".encode('utf-8')
+    ).hexdigest()[:20]
+
+
+def _to_storable(df):
+    """将混合类型的文本列统一为字符串，保证可以写入列式格式；没有需要转换的列时不复制"""
+    converted = {
+        col: values.where(values.isna(), values.astype(str))
+        for col, values in df.items() if values.dtype == object
+    }
+    return df.assign(**converted) if converted else df
+
+
+def _read_cached_frame(cache_path):
+    """读取磁盘缓存，缓存缺失或损坏时返回 None"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception:
+        return None
+
+
+def _write_cached_frame(df, cache_path):
+    """原子写入磁盘缓存"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # 缓存写入失败不影响本次加载
+        pass
+
+
+def _match_sheet(sheet_name, sheet_patterns):
+    """工作表名是否匹配任一通配模式"""
+    return any(
+        fnmatch.fnmatchcase(sheet_name, pattern.strip())
+        for pattern in sheet_patterns.split(',') if pattern.strip()
+    )
+
+
+def iter_workbook_chunks(path, sheet_patterns=SHEET_PATTERNS, chunk_rows=STREAM_CHUNK_ROWS):
+    """以 openpyxl 只读模式逐行迭代匹配的工作表，每次产出不超过 chunk_rows 行的原始 DataFrame"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            if not _match_sheet(sheet.title, sheet_patterns):
+                continue
+
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            # 去掉表头右侧的空白列
+            width = max((i + 1 for i, name in enumerate(header) if name is not None), default=0)
+            columns = [
+                str(name).strip() if name is not None else f"Unnamed: {i}"
+                for i, name in enumerate(header[:width])
+            ]
+            # 跳过不是课程数据的工作表（如说明页）
+            if not all(col in columns for col in REQUIRED_COLS):
+                continue
+
+            chunk = []
+            for row in rows:
+                row = row[:width]
+                if all(value is None for value in row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_rows:
+                    yield sheet.title, pd.DataFrame(chunk, columns=columns).infer_objects()
+                    chunk = []
+            if chunk:
+                yield sheet.title, pd.DataFrame(chunk, columns=columns).infer_objects()
+    finally:
+        workbook.close()
+
+
+def _use_streaming(path, sheet_patterns):
+    """多工作表或大文件时使用流式读取"""
+    return sheet_patterns != 'Sheet1' or os.path.getsize(path) > STREAM_THRESHOLD_MB * 1024 * 1024
+
+
+def iter_raw_frames(path, sheet_patterns=SHEET_PATTERNS, chunk_rows=STREAM_CHUNK_ROWS):
+    """逐块产出未清洗的原始行（带来源工作表列）；大文件按块流式读取，小文件一次读入"""
+    if _use_streaming(path, sheet_patterns):
+        for sheet_name, chunk in iter_workbook_chunks(path, sheet_patterns, chunk_rows):
+            chunk['来源工作表'] = sheet_name
+            yield chunk
+    else:
+        # 读取Excel文件
+        df = pd.read_excel(path, sheet_name=sheet_patterns)
+
+        # 清理列名（去除空格等）
+        df.columns = df.columns.str.strip()
+        df['来源工作表'] = sheet_patterns
+        yield df
+
+
+# 增量导入：按行内容哈希与上一次导入的快照对比，只对新增或修改的行执行逐行清洗
+# 快照即磁盘缓存：保存预处理结果、每行的内容哈希与行键哈希、中位数填充标记，以及数值列的取值计数
+SNAPSHOT_KEY_COLS = ['来源工作表', '高校名称', '课程名']
+SNAPSHOT_COLS = ['_row_hash', '_row_key', '_imputed']
+# 同一哈希第 k 次出现时与 k 组合，使重复行也有唯一标识
+_OCCURRENCE_SALT = np.uint64(0x9E3779B97F4A7C15)
+_HASH_PRIME = np.uint64(0x100000001B3)
+_NULL_HASH = np.uint64(0x2545F4914F6CDD1D)
+
+# 上一次导入的快照：带隐藏列的预处理结果、数值列取值计数、对应的工作簿版本
+IngestSnapshot = namedtuple('IngestSnapshot', ['frame', 'counts', 'workbook_key'])
+
+# 增量导入的结果：新增、修改、删除、未变行数（内容相同为未变，行键相同、内容不同为修改），以及实际执行清洗的行数
+IngestDelta = namedtuple('IngestDelta', ['inserted', 'updated', 'deleted', 'unchanged', 'cleaned'])
+
+
+class ValueCounts:
+    """可增删的数值取值计数，用于增量维护整列中位数
+
+    课程数据的学分、学时、课堂规模取值很少，中位数按不同取值个数计算，与总行数无关。
+    """
+
+    def __init__(self, counts=None):
+        self.counts = Counter(dict(counts or []))
+
+    def update(self, values, sign=1):
+        """加入（sign=1）或移除（sign=-1）一组取值，空值忽略"""
+        values = np.asarray(values, dtype='float64')
+        uniques, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        for value, count in zip(uniques.tolist(), counts.tolist()):
+            self.counts[value] += sign * count
+            if self.counts[value] <= 0:
+                del self.counts[value]
+
+    def median(self):
+        """与 Series.median 一致的中位数；没有取值时返回 0"""
+        if not self.counts:
+            return 0
+        values = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[value] for value in values])
+        total = cumulative[-1]
+        lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+        upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+        return (lower + upper) / 2
+
+    def merge(self, other):
+        """并入另一份计数（如另一个工作簿的取值）"""
+        self.counts.update(other.counts)
+
+    def to_list(self):
+        return [[value, count] for value, count in self.counts.items()]
+
+
+def _column_hashes(values):
+    """逐行哈希一列：只对去重后的取值计算哈希再按编码广播；数值统一按 float64 计算，
+    避免分块推断出的整数/浮点类型不同导致哈希变化"""
+    if pd.api.types.is_numeric_dtype(values):
+        values = values.astype('float64')
+    codes, uniques = pd.factorize(values)
+    hashed = pd.util.hash_array(np.asarray(uniques, dtype=uniques.dtype if uniques.dtype.kind == 'f' else object))
+    return np.append(hashed, _NULL_HASH)[codes]
+
+
+def _row_hashes(df, cols=None):
+    """逐行内容哈希，按列依次混合"""
+    hashes = np.zeros(len(df), dtype='uint64')
+    for col in (df.columns if cols is None else [col for col in cols if col in df.columns]):
+        hashes = (hashes ^ _column_hashes(df[col])) * _HASH_PRIME
+    return hashes
+
+
+def _with_occurrence(hashes):
+    """哈希与其出现序号组合，得到可一一对应的行标识"""
+    occurrence = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy(dtype='uint64')
+    return hashes + occurrence * _OCCURRENCE_SALT
+
+
+def _lookup_sorted(sorted_values, values):
+    """在升序数组中查找 values，返回 (位置, 是否存在)"""
+    positions = np.searchsorted(sorted_values, values)
+    found = np.zeros(len(values), dtype=bool)
+    inside = positions < len(sorted_values)
+    found[inside] = sorted_values[positions[inside]] == values[inside]
+    return positions, found
+
+
+def _snapshot_paths(path, sheet_patterns):
+    """增量导入快照的数据文件和元数据文件路径"""
+    stem = os.path.join(CACHE_DIR, f"snapshot_{_source_key(path, sheet_patterns)}")
+    return f"{stem}.parquet", f"{stem}.json"
+
+
+def _read_snapshot(path, sheet_patterns):
+    """读取上一次导入的快照；不存在、规则版本变化或与元数据不一致时返回 None"""
+    frame_path, meta_path = _snapshot_paths(path, sheet_patterns)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != PREPROCESS_VERSION:
+        return None
+
+    frame = _read_cached_frame(frame_path)
+    if frame is None or hashlib.sha256(frame['_row_hash'].to_numpy().tobytes()).hexdigest() != meta['digest']:
+        return None
+    counts = {col: ValueCounts(pairs) for col, pairs in meta['counts'].items()}
+    return IngestSnapshot(frame, counts, meta['workbook_key'])
+
+
+def _write_snapshot(snapshot, path, sheet_patterns):
+    """原子写入快照：先写数据文件，再写记录其摘要的元数据文件"""
+    frame_path, meta_path = _snapshot_paths(path, sheet_patterns)
+    _write_cached_frame(_to_storable(snapshot.frame), frame_path)
+    # 清理旧版本按工作簿版本命名的整表缓存
+    legacy_prefix = f"courses_{_source_key(path, sheet_patterns)}_"
+    for name in os.listdir(CACHE_DIR) if os.path.isdir(CACHE_DIR) else []:
+        if name.startswith(legacy_prefix) and name.endswith('.parquet'):
+            os.remove(os.path.join(CACHE_DIR, name))
+    meta = {
+        'version': PREPROCESS_VERSION,
+        'workbook_key': snapshot.workbook_key,
+        'digest': hashlib.sha256(snapshot.frame['_row_hash'].to_numpy().tobytes()).hexdigest(),
+        'counts': {col: value_counts.to_list() for col, value_counts in snapshot.counts.items()},
+    }
+    try:
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    except OSError:
+        pass
+
+
+def _align_dtypes(frame, like):
+    """把新清洗的行转为快照的列类型，合并时整列不必退化为 object；分类列取两者类别的并集"""
+    for col in frame.columns.intersection(like.columns):
+        dtype = like[col].dtype
+        if frame[col].dtype == dtype:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories.union(pd.Index(frame[col].dropna().unique()))
+            like[col] = like[col].cat.set_categories(categories)
+            frame[col] = frame[col].astype(like[col].dtype)
+        elif isinstance(dtype, pd.StringDtype) and frame[col].dtype == object:
+            frame[col] = frame[col].astype(dtype)
+
+
+def _unimputed_values(frame, col, bit):
+    """数值列填充前的取值：中位数填充的单元格还原为空值"""
+    values = frame[col].to_numpy(dtype='float64')
+    return np.where((frame['_imputed'].to_numpy() >> bit) & 1 == 1, np.nan, values)
+
+
+def ingest_workbook(path, sheet_patterns=SHEET_PATTERNS, chunk_rows=STREAM_CHUNK_ROWS, previous=None):
+    """增量读取并预处理工作簿，写入新快照，返回 (新快照, IngestDelta)
+
+    内容未变的行直接复用上一次快照（previous，未给出时从磁盘读取）中的清洗结果，
+    只有新增或修改的行执行 clean_rows；中位数由取值计数增减得到，
+    中位数变化时只需改写被填充的单元格及其学时分层。
+    """
+    workbook_key = _workbook_key(path)
+    if previous is None:
+        previous = _read_snapshot(path, sheet_patterns)
+    if previous is None:
+        old = pd.DataFrame({'_row_hash': np.array([], dtype='uint64'), '_row_key': np.array([], dtype='uint64'),
+                            '_imputed': np.array([], dtype='uint8')})
+        counts = {}
+    else:
+        old = previous.frame
+        counts = {col: ValueCounts(value_counts.to_list()) for col, value_counts in previous.counts.items()}
+    old_hashes = old['_row_hash'].to_numpy(dtype='uint64')
+    known_hashes, first_old = np.unique(old_hashes, return_index=True)
+
+    hashes, keys, fresh, cleaned_chunks, empty_chunks = [], [], [], [], []
+    for raw in iter_raw_frames(path, sheet_patterns, chunk_rows):
+        chunk_hashes = _row_hashes(raw)
+        chunk_fresh = ~_lookup_sorted(known_hashes, chunk_hashes)[1]
+        hashes.append(chunk_hashes)
+        keys.append(_row_hashes(raw, SNAPSHOT_KEY_COLS))
+        fresh.append(chunk_fresh)
+        # 空表清洗代价可以忽略，用于得到与整表清洗一致的列顺序
+        empty_chunks.append(clean_rows(raw.iloc[:0]))
+        if chunk_fresh.any():
+            cleaned_chunks.append(clean_rows(raw[chunk_fresh]))
+        del raw
+
+    if not hashes:
+        raise ValueError(f"工作簿中没有匹配 '{sheet_patterns}' 且包含 {REQUIRED_COLS} 列的工作表")
+
+    hashes, keys, fresh = np.concatenate(hashes), np.concatenate(keys), np.concatenate(fresh)
+    columns = pd.concat(empty_chunks).columns.tolist()
+    numeric_cols = [col for col in NUMERIC_COLS if col in columns]
+
+    # 新增的清洗结果：记录需要中位数填充的单元格，学时分层先按已有学时计算
+    cleaned = pd.concat(cleaned_chunks or empty_chunks, ignore_index=True).infer_objects()
+    imputed = np.zeros(len(cleaned), dtype='uint8')
+    for bit, col in enumerate(numeric_cols):
+        imputed |= cleaned[col].isna().to_numpy().astype('uint8') << bit
+    cleaned['_imputed'] = imputed
+    if '学时' in cleaned.columns:
+        cleaned['学时分层'] = hour_bands(cleaned['学时'])
+
+    # 按 (内容哈希, 出现序号) 配对新旧行：未配对的旧行已删除，未配对的新行为新增
+    matched = pd.Index(_with_occurrence(old_hashes)).get_indexer(_with_occurrence(hashes))
+    removed = np.ones(len(old), dtype=bool)
+    removed[matched[matched >= 0]] = False
+    added = matched < 0
+
+    # 每个新行的来源：快照中同内容的首行，或本次清洗结果中的对应行
+    sources = np.empty(len(hashes), dtype='int64')
+    sources[~fresh] = first_old[_lookup_sorted(known_hashes, hashes[~fresh])[0]]
+    sources[fresh] = len(old) + np.arange(int(fresh.sum()))
+    if len(old) and len(cleaned):
+        old = old.copy(deep=False)
+        _align_dtypes(cleaned, old)
+    parts = [frame for frame in (old, cleaned) if len(frame)]
+    combined = pd.concat(parts, ignore_index=True) if len(parts) > 1 else (parts[0] if parts else cleaned)
+    df = combined.take(sources).reset_index(drop=True)
+
+    # 增量维护中位数：减去删除行、加上新增行的原始取值
+    for bit, col in enumerate(numeric_cols):
+        value_counts = counts.setdefault(col, ValueCounts())
+        if col in old.columns:
+            value_counts.update(_unimputed_values(old, col, bit)[removed], sign=-1)
+        value_counts.update(_unimputed_values(df, col, bit)[added])
+
+    # 只改写中位数填充的单元格，学时被填充的行重新计算学时分层
+    for bit, col in enumerate(numeric_cols):
+        df[col] = df[col].astype('float64')
+        imputed = (df['_imputed'].to_numpy() >> bit) & 1 == 1
+        if imputed.any():
+            df.loc[imputed, col] = counts[col].median()
+            if col == '学时':
+                df.loc[imputed, '学时分层'] = hour_bands(df.loc[imputed, '学时'])
+    counts = {col: counts[col] for col in numeric_cols}
+
+    df['_row_hash'] = hashes
+    df['_row_key'] = keys
+    if '学时' in columns:
+        columns.append('学时分层')
+    snapshot = IngestSnapshot(compact_dtypes(df[columns + SNAPSHOT_COLS]), counts, workbook_key)
+    _write_snapshot(snapshot, path, sheet_patterns)
+
+    # 在内容配对的基础上统计变化：删除行与新增行中行键相同的按出现序号配对为修改，
+    # 只在未配对的行之间配对，删除靠前的重复行不会使其后内容未变的行计为修改
+    old_keys = old['_row_key'].to_numpy(dtype='uint64')[removed]
+    updated = int(np.count_nonzero(
+        pd.Index(_with_occurrence(old_keys)).get_indexer(_with_occurrence(keys[added])) >= 0
+    ))
+    delta = IngestDelta(
+        inserted=int(np.count_nonzero(added)) - updated,
+        updated=updated,
+        deleted=int(np.count_nonzero(removed)) - updated,
+        unchanged=int(np.count_nonzero(~added)),
+        cleaned=int(fresh.sum()),
+    )
+    return snapshot, delta
+
+
+def load_snapshot(path, sheet_patterns=SHEET_PATTERNS):
+    """返回工作簿的最新快照：工作簿未变时直接读取磁盘快照，变化时增量更新"""
+    snapshot = _read_snapshot(path, sheet_patterns)
+    if snapshot is None or snapshot.workbook_key != _workbook_key(path):
+        snapshot, _ = ingest_workbook(path, sheet_patterns, previous=snapshot)
+        # 返回与磁盘快照相同的列类型，保证冷启动与热启动结果一致
+        snapshot = _read_snapshot(path, sheet_patterns) or snapshot._replace(frame=_to_storable(snapshot.frame))
+    return snapshot
+
+
+def read_workbook(path, sheet_patterns=SHEET_PATTERNS):
+    """读取并预处理单个工作簿"""
+    return load_snapshot(path, sheet_patterns).frame.drop(columns=SNAPSHOT_COLS)
+
+
+# 多工作簿导入：数据源可以是目录或通配模式（如 "surveys/*.xlsx"），每个工作簿由一个进程预处理
+INGEST_WORKERS = int(os.environ.get('COURSE_INGEST_WORKERS', '0')) or os.cpu_count() or 1
+# 标记每行来自哪个工作簿
+ORIGIN_COL = '来源文件'
+
+
+def is_multi_source(source):
+    """数据源是否为目录或通配模式"""
+    return os.path.isdir(source) or any(ch in source for ch in '*?[')
+
+
+def resolve_workbooks(source):
+    """目录或通配模式匹配到的工作簿，按路径排序，忽略 Excel 的临时锁文件"""
+    pattern = os.path.join(source, '*.xlsx') if os.path.isdir(source) else source
+    return sorted(
+        path for path in glob.glob(pattern)
+        if os.path.isfile(path) and not os.path.basename(path).startswith('~$')
+    )
+
+
+def source_stat(source=DATA_FILE):
+    """数据源的变更检测标识：单个工作簿的状态，或目录/通配模式下全部工作簿的状态"""
+    if is_multi_source(source):
+        return tuple(workbook_stat(path) for path in resolve_workbooks(source))
+    return workbook_stat(source)
+
+
+def _refresh_snapshot(path, sheet_patterns):
+    """进程池任务：快照过期时增量导入该工作簿并写入快照，返回变化统计（快照有效时为 None）"""
+    snapshot = _read_snapshot(path, sheet_patterns)
+    if snapshot is not None and snapshot.workbook_key == _workbook_key(path):
+        return None
+    return ingest_workbook(path, sheet_patterns, previous=snapshot)[1]
+
+
+def _restore_imputed(frame):
+    """把快照中按单个工作簿中位数填充的单元格还原为空值，等待按全局中位数重新填充"""
+    numeric_cols = [col for col in NUMERIC_COLS if col in frame.columns]
+    restored = {col: _unimputed_values(frame, col, bit) for bit, col in enumerate(numeric_cols)}
+    return frame.assign(**restored).drop(columns=SNAPSHOT_COLS)
+
+
+def read_workbooks(paths, sheet_patterns=SHEET_PATTERNS, max_workers=INGEST_WORKERS):
+    """并行读取并预处理多个工作簿，合并为一个数据集
+
+    第一阶段：各工作簿在独立进程中读取、逐行清洗并写入各自的快照，快照附带数值列取值计数；
+    第二阶段：合并取值计数得到全局中位数，统一填充缺失值和学时分层，结果与整体预处理一致。
+    """
+    if not paths:
+        raise ValueError("没有找到匹配的工作簿")
+
+    workers = min(max_workers, len(paths))
+    if workers > 1:
+        # spawn 启动的子进程只导入本模块，不继承 Streamlit 服务进程的线程状态
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            list(pool.map(_refresh_snapshot, paths, [sheet_patterns] * len(paths)))
+
+    frames, counts = [], {}
+    for path in paths:
+        snapshot = load_snapshot(path, sheet_patterns)
+        for col, value_counts in snapshot.counts.items():
+            counts.setdefault(col, ValueCounts()).merge(value_counts)
+        frame = _restore_imputed(snapshot.frame)
+        frame.insert(
+            frame.columns.get_loc('来源工作表') + 1 if '来源工作表' in frame.columns else len(frame.columns),
+            ORIGIN_COL, os.path.basename(path)
+        )
+        frames.append(frame)
+
+    df = pd.concat(frames, ignore_index=True)
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            missing = df[col].isna().to_numpy()
+            if missing.any():
+                df[col] = df[col].astype('float64')
+                df.loc[missing, col] = counts.get(col, ValueCounts()).median()
+                if col == '学时':
+                    df.loc[missing, '学时分层'] = hour_bands(df.loc[missing, '学时'])
+    return compact_dtypes(df)
+
+
+def read_source(source=DATA_FILE, sheet_patterns=SHEET_PATTERNS):
+    """读取数据源：单个工作簿，或目录/通配模式匹配到的全部工作簿"""
+    if is_multi_source(source):
+        return read_workbooks(resolve_workbooks(source), sheet_patterns)
+    return read_workbook(source, sheet_patterns)
+
+
+def _stat_version(stat):
+    """由数据源状态得到的版本标识"""
+    return hashlib.sha256(repr(stat).encode('utf-8')).hexdigest()[:12]
+
+
+def dataset_version(source=DATA_FILE):
+    """当前数据集版本标识，数据源中任一工作簿变化后随之改变"""
+    return _stat_version(source_stat(source))
+
+
+# 加载期索引
+# 机房已有的软件（按名称包含匹配，不区分大小写）
+LAB_TOOLS = ['SPSS', 'Stata', 'Excel']
+
+# 软件工具倒排索引：词表 + 稀疏的 (课程行, 工具编号) 关联数组，行号按数据集位置升序
+ToolIndex = namedtuple('ToolIndex', ['labels', 'tools', 'rows', 'tool_ids', 'lab_flags'])
+
+
+def split_tools(text):
+    """将一条软件工具文本拆分为去重后的工具名列表"""
+    tools = []
+    if pd.isna(text) or text == '未提供':
+        return tools
+    # 分割多种工具
+    for tool in str(text).split(','):
+        for t in tool.split('、'):
+            clean_tool = t.strip()
+            if clean_tool and clean_tool != '无' and clean_tool not in tools:
+                tools.append(clean_tool)
+    return tools
+
+
+def _expand_unique_lists(codes, unique_lists):
+    """把按去重文本解析出的列表展开到各行
+
+    codes 为各行文本的编码（空值为 -1），unique_lists 为各去重文本解析出的列表，末尾一项对应空值。
+    返回 (行号, 扁平位置)：第 k 个元素属于第 rows[k] 行，是 unique_lists 展平后第 positions[k] 个元素。
+    """
+    lengths = np.array([len(items) for items in unique_lists], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    row_lengths = lengths[codes]
+    rows = np.repeat(np.arange(len(codes), dtype=np.int32), row_lengths)
+    row_starts = np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    positions = np.repeat(offsets[codes], row_lengths) + np.arange(len(rows)) - row_starts
+    return rows, positions.astype(np.int64)
+
+
+def build_tool_index(df):
+    """对软件工具列只分词一次，构建工具词表和课程×工具关联数组"""
+    # 工具文本取值重复度高：只对去重后的文本分词，再按编码展开到各行
+    codes, uniques = pd.factorize(df['软件工具'])
+    vocabulary = {}
+    unique_ids = []
+    for text in uniques:
+        unique_ids.append([vocabulary.setdefault(tool, len(vocabulary)) for tool in split_tools(text)])
+    # 末尾追加一项对应空值（编码 -1）
+    unique_ids.append([])
+
+    flat_ids = np.array([tool_id for ids in unique_ids for tool_id in ids], dtype=np.int32)
+    rows, positions = _expand_unique_lists(codes, unique_ids)
+
+    tools = np.array(list(vocabulary), dtype=object)
+    lab_flags = np.array([
+        any(lab_tool.lower() in tool.lower() for lab_tool in LAB_TOOLS) for tool in tools
+    ], dtype=bool)
+
+    return ToolIndex(df.index, tools, rows, flat_ids[positions], lab_flags)
+
+
+def subset_mask(labels, subset):
+    """将子集（筛选结果）转换为全量数据集上的行掩码"""
+    mask = np.zeros(len(labels), dtype=bool)
+    mask[labels.get_indexer(subset.index)] = True
+    return mask
+
+
+def count_tools(tool_index, mask):
+    """统计掩码选中的课程中每个工具的使用课程数，以及工具首次出现的位置"""
+    selected_ids = tool_index.tool_ids[mask[tool_index.rows]]
+    counts = np.bincount(selected_ids, minlength=len(tool_index.tools))
+    first_seen = np.full(len(tool_index.tools), len(selected_ids), dtype=np.int64)
+    unique_ids, first_pos = np.unique(selected_ids, return_index=True)
+    first_seen[unique_ids] = first_pos
+    return counts, first_seen
+
+
+# 考核内容成分：按顺序匹配关键词（不区分大小写），先匹配的成分优先，如“开题报告”归为开题报告而非报告；
+# 未匹配任何关键词的片段原样保留为单独的成分
+ASSESSMENT_COMPONENTS = [
+    ('开题报告', ['开题']),
+    ('研究计划', ['研究计划', '计划书', '研究设计']),
+    ('论文', ['论文']),
+    ('考试', ['考试', '闭卷', '开卷', '测验', '笔试']),
+    ('汇报', ['汇报', '展示', 'presentation']),
+    ('答辩', ['答辩']),
+    ('报告', ['报告']),
+    ('作业', ['作业', '练习', '习题']),
+    ('软件实操', ['实操', '上机', '实验', '软件']),
+    ('阅读笔记', ['笔记', '阅读']),
+    ('出勤', ['出勤', '考勤', '签到']),
+    ('课堂表现', ['课堂', '参与', '讨论', '表现']),
+    ('过程评价', ['形成性', '过程']),
+]
+ASSESSMENT_SEPARATORS = r'[、,，+＋;；/|\n]|以及|和'
+ASSESSMENT_PERCENT = r'(\d+(?:\.\d+)?)\s*[%％]'
+ASSESSMENT_MISSING_VALUES = ['未提供', '无', '']
+
+# 考核成分索引：成分词表 + 稀疏的课程×成分矩阵（行号、成分编号、该成分的百分比权重，未写明时为 NaN）
+AssessmentIndex = namedtuple('AssessmentIndex', ['labels', 'components', 'rows', 'component_ids', 'weights'])
+
+
+def split_assessment(text):
+    """将一条考核内容拆分为 {成分: 权重}；同一成分出现多次时权重相加，都未写明百分比时为 NaN"""
+    components = {}
+    if pd.isna(text) or str(text).strip() in ASSESSMENT_MISSING_VALUES:
+        return components
+    for part in re.split(ASSESSMENT_SEPARATORS, str(text)):
+        percents = re.findall(ASSESSMENT_PERCENT, part)
+        part = re.sub(ASSESSMENT_PERCENT, '', part).strip(' \t（）()：:')
+        if not part or part in ASSESSMENT_MISSING_VALUES:
+            continue
+        lowered = part.lower()
+        name = next(
+            (component for component, keywords in ASSESSMENT_COMPONENTS if any(k in lowered for k in keywords)),
+            part,
+        )
+        weight = sum(float(p) for p in percents) if percents else np.nan
+        previous = components.get(name, np.nan)
+        components[name] = weight if np.isnan(previous) else previous + np.nan_to_num(weight)
+    return components
+
+
+def build_assessment_index(df):
+    """对考核内容只解析一次，构建成分词表和课程×成分稀疏矩阵"""
+    # 只解析去重后的文本，再按编码展开到各行
+    codes, uniques = pd.factorize(df['考核内容'])
+    vocabulary = {}
+    unique_ids, unique_weights = [], []
+    for text in uniques:
+        components = split_assessment(text)
+        unique_ids.append([vocabulary.setdefault(name, len(vocabulary)) for name in components])
+        unique_weights.extend(components.values())
+    # 末尾追加一项对应空值（编码 -1）
+    unique_ids.append([])
+
+    flat_ids = np.array([component_id for ids in unique_ids for component_id in ids], dtype=np.int32)
+    flat_weights = np.array(unique_weights, dtype='float64')
+    rows, positions = _expand_unique_lists(codes, unique_ids)
+
+    return AssessmentIndex(
+        df.index, np.array(list(vocabulary), dtype=object), rows, flat_ids[positions], flat_weights[positions]
+    )
+
+
+def count_components(assessment_index, mask):
+    """掩码选中课程的成分矩阵归约：各成分的课程数、写明权重的课程数、权重之和和首次出现的位置"""
+    selected = mask[assessment_index.rows]
+    ids = assessment_index.component_ids[selected]
+    weights = assessment_index.weights[selected]
+    n_components = len(assessment_index.components)
+    counts = np.bincount(ids, minlength=n_components)
+    weighted = ~np.isnan(weights)
+    weight_counts = np.bincount(ids[weighted], minlength=n_components)
+    weight_sums = np.bincount(ids[weighted], weights=weights[weighted], minlength=n_components)
+    first_seen = np.full(n_components, len(ids), dtype=np.int64)
+    unique_ids, first_pos = np.unique(ids, return_index=True)
+    first_seen[unique_ids] = first_pos
+    return counts, weight_counts, weight_sums, first_seen
+
+
+class FilterEngine:
+    """侧边栏筛选引擎：分类字段按取值保存压缩行位图，学时保存排序索引，结果按筛选条件缓存"""
+
+    def __init__(self, df, category_cols=('高校名称', '教学模式'), range_col='学时', memo_size=64):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for col in category_cols:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                self.bitmaps[col] = {
+                    value: np.packbits(codes == i) for i, value in enumerate(uniques)
+                }
+
+        self.range_col = range_col if range_col in df.columns else None
+        if self.range_col:
+            values = df[range_col].to_numpy(dtype=np.float64)
+            self.order = np.argsort(values, kind='stable')
+            self.sorted_values = values[self.order]
+
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def normalize(self, selections, value_range=None):
+        """规范化筛选条件：空选择或全选视为不筛选，覆盖全部取值的区间视为不筛选"""
+        key = []
+        for col in sorted(self.bitmaps):
+            selected = selections.get(col)
+            if not selected:
+                continue
+            selected = frozenset(selected)
+            if selected >= set(self.bitmaps[col]):
+                continue
+            key.append((col, selected))
+
+        if self.range_col and value_range is not None and self.n_rows:
+            low, high = value_range
+            if low > self.sorted_values[0] or high < self.sorted_values[-1]:
+                key.append((self.range_col, (low, high)))
+
+        return tuple(key)
+
+    def _range_bitmap(self, low, high):
+        """用 searchsorted 在排序索引上回答区间查询"""
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return np.packbits(mask)
+
+    def _evaluate(self, key):
+        """对规范化后的条件做位图运算，返回选中行的位置"""
+        if not key:
+            return np.arange(self.n_rows)
+
+        result = None
+        for col, condition in key:
+            if col == self.range_col:
+                bitmap = self._range_bitmap(*condition)
+            else:
+                bitmap = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+                for value in condition:
+                    value_bitmap = self.bitmaps[col].get(value)
+                    if value_bitmap is not None:
+                        bitmap |= value_bitmap
+            result = bitmap if result is None else result & bitmap
+
+        return np.flatnonzero(np.unpackbits(result, count=self.n_rows))
+
+    def filter(self, selections, value_range=None):
+        """返回满足筛选条件的行位置（只读数组），相同条件直接命中缓存"""
+        key = self.normalize(selections, value_range)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        positions = self._evaluate(key)
+        positions.flags.writeable = False
+
+        with self._lock:
+            self._memo[key] = positions
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return positions
+
+
+# 预聚合立方体：按维度组合保存课程数、数值列之和与是/否字段的“是”计数
+# 学时本身也作为维度，侧边栏的学时区间可以在分组上精确回答；学时分层由学时决定，不增加分组数
+CUBE_DIMS = ['高校名称', '教学模式', '学时分层', '面向层次', '学时']
+CUBE_SUM_COLS = ['学时', '学分', '平时权重', '期末权重']
+# 教学方法名称 → 是/否字段
+TEACHING_METHODS = {
+    '翻转课堂': '是否翻转课堂',
+    '软件实操': '是否有软件实操',
+    '开题报告': '是否有开题报告',
+    '课程答辩': '是否有答辩',
+}
+
+
+# 分组分位数概要的质心个数上限：不同取值不超过该数时概要是精确的，否则按分位数合并相邻取值
+SKETCH_CENTROIDS = 256
+# 预聚合立方体为这些数值列保存各分组的分位数概要
+CUBE_SKETCH_COLS = ['课堂规模']
+
+
+class QuantileSketch:
+    """按分组保存的可合并分位数概要：全部分组共享一组质心，每个分组只存各质心上的计数
+
+    若干分组的合并就是计数相加，得到的直方图大小不超过 SKETCH_CENTROIDS，与行数无关。
+    """
+
+    def __init__(self, values, groups, max_centroids=SKETCH_CENTROIDS):
+        values = np.asarray(values, dtype='float64')
+        groups = np.asarray(groups)
+        present = ~np.isnan(values)
+        values, groups = values[present], groups[present]
+
+        uniques = np.unique(values)
+        if len(uniques) <= max_centroids:
+            self.centroids = uniques
+            codes = np.searchsorted(uniques, values)
+        else:
+            # 取值过多时按等频边界分桶，质心取桶内均值
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, max_centroids + 1)[1:-1]))
+            codes = np.searchsorted(edges, values, side='right')
+            sums = np.bincount(codes, weights=values, minlength=len(edges) + 1)
+            counts = np.bincount(codes, minlength=len(edges) + 1)
+            self.centroids = sums[counts > 0] / counts[counts > 0]
+            codes = np.cumsum(counts > 0)[codes] - 1
+
+        # 稀疏存储：(分组, 质心) → 计数
+        width = max(len(self.centroids), 1)
+        pairs, self.counts = np.unique(groups.astype('int64') * width + codes, return_counts=True)
+        self.groups, self.codes = np.divmod(pairs, width)
+
+    def histogram(self, group_mask):
+        """合并选中分组的概要，返回各质心上的计数"""
+        selected = group_mask[self.groups]
+        return np.bincount(self.codes[selected], weights=self.counts[selected], minlength=len(self.centroids))
+
+
+def _weighted_quantile(values, counts, cumulative, q):
+    """与 np.quantile（linear 插值）在展开后的数据上相同的分位数"""
+    position = (cumulative[-1] - 1) * q
+    lower = np.floor(position)
+    low_value = values[np.searchsorted(cumulative, lower, side='right')]
+    high_value = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return low_value + (high_value - low_value) * (position - lower)
+
+
+def box_statistics(values, counts):
+    """由 (取值, 计数) 直方图计算箱线图统计量：四分位数、须（1.5 倍四分位距内的极值）和离群值；没有数据时返回 None"""
+    keep = counts > 0
+    values, counts = np.asarray(values)[keep], np.asarray(counts)[keep]
+    if not len(values):
+        return None
+    cumulative = np.cumsum(counts)
+    q1, median, q3 = (_weighted_quantile(values, counts, cumulative, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': values[inside].min(),
+        'upperfence': values[inside].max(),
+        'mean': float(np.dot(values, counts) / cumulative[-1]),
+        'count': int(cumulative[-1]),
+        'outliers': pd.DataFrame({'取值': values[~inside], '课程数': counts[~inside].astype('int64')}),
+    }
+
+
+def _percent(true_count, count):
+    """“是”计数占课程数的百分比；没有课程时为 NaN，与空数据上的 mean 一致"""
+    return true_count / count * 100 if count else np.nan
+
+
+class AggregateCube:
+    """加载期预聚合，任意侧边栏筛选条件的统计量由匹配分组求和得到，代价与分组数而非行数相关"""
+
+    def __init__(self, df, dims=CUBE_DIMS):
+        self.dims = [col for col in dims if col in df.columns]
+        self.sum_cols = [col for col in CUBE_SUM_COLS if col in df.columns]
+        self.flag_cols = [col for col in FLAG_COLS if col in df.columns]
+
+        measures = df[self.sum_cols + self.flag_cols].rename(columns={col: f'{col}_sum' for col in self.sum_cols})
+        measures = measures.assign(**{col: measures[col].astype('int64') for col in self.flag_cols})
+        grouped = measures.groupby([df[col] for col in self.dims], observed=True, dropna=False, sort=False)
+        self.cells = grouped.sum().assign(课程数=grouped.size()).reset_index()
+        # 每行所属分组的编号与 cells 的行顺序一致，用于按分组保存分位数概要
+        cell_ids = grouped.ngroup().to_numpy()
+        self.sketches = {
+            col: QuantileSketch(df[col], cell_ids) for col in CUBE_SKETCH_COLS if col in df.columns
+        }
+        self.categories = {
+            col: df[col].cat.categories for col in self.dims if isinstance(df[col].dtype, pd.CategoricalDtype)
+        }
+
+        # 查询在 numpy 数组上进行：维度列编码为整数（空值为 -1），度量列合成一个矩阵
+        self.codes = {col: pd.factorize(self.cells[col]) for col in self.dims}
+        self.measure_cols = [col for col in self.cells.columns if col not in self.dims]
+        self.matrix = self.cells[self.measure_cols].to_numpy(dtype='float64')
+        self.course_counts = self.cells['课程数'].to_numpy()
+        self.hours = self.cells['学时'].to_numpy() if '学时' in self.dims else None
+
+    def select(self, key=()):
+        """规范化筛选条件（FilterEngine.normalize 的结果）匹配的分组，返回布尔掩码"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for col, condition in key:
+            if col not in self.dims:
+                raise KeyError(f"预聚合立方体不包含筛选列: {col}")
+            if isinstance(condition, tuple):
+                low, high = condition
+                values = self.cells[col].to_numpy()
+                mask &= (values >= low) & (values <= high)
+            else:
+                codes, uniques = self.codes[col]
+                wanted = uniques.get_indexer(list(condition))
+                mask &= np.isin(codes, wanted[wanted >= 0])
+        return mask
+
+    def totals(self, mask):
+        """分组求和：课程数、数值列之和、是/否字段的“是”计数"""
+        return dict(zip(self.measure_cols, self.matrix[mask].sum(axis=0)))
+
+    def counts_by(self, col, key=()):
+        """按某一维度统计课程数，顺序与 value_counts 一致（按课程数降序）"""
+        mask = self.select(key)
+        codes, uniques = self.codes[col]
+        mask &= codes >= 0
+        counts = pd.Series(
+            np.bincount(codes[mask], weights=self.course_counts[mask], minlength=len(uniques)).astype('int64'),
+            index=pd.Index(uniques, name=col),
+        )
+        if col in self.categories:
+            counts = counts.reindex(self.categories[col], fill_value=0)
+        return counts.rename_axis(col).rename('count').sort_values(ascending=False, kind='stable')
+
+    def overview(self, key=()):
+        """顶部指标，与 summarize_overview 相同"""
+        mask = self.select(key)
+        totals = self.totals(mask)
+        count = totals['课程数']
+        universities = self.codes['高校名称'][0][mask]
+        return {
+            '调研高校数': len(np.unique(universities[universities >= 0])),
+            '平均学时': totals['学时_sum'] / count if count else np.nan,
+            '翻转课堂比例': _percent(totals['是否翻转课堂'], count),
+            '软件实操比例': _percent(totals['是否有软件实操'], count),
+        }
+
+    def short_hour(self, key=(), max_hours=32):
+        """短学时课程特点，与 summarize_short_hour_courses 相同"""
+        totals = self.totals(self.select(key) & (self.hours <= max_hours))
+        count = totals['课程数']
+        if not count:
+            return None
+        return {
+            '短学时课程数': int(count),
+            '平均学分': totals['学分_sum'] / count,
+            '翻转课堂比例': _percent(totals['是否翻转课堂'], count),
+            '软件实操比例': _percent(totals['是否有软件实操'], count),
+        }
+
+    def box_stats(self, col, key=()):
+        """合并匹配分组的分位数概要，返回箱线图统计量（见 box_statistics）"""
+        sketch = self.sketches[col]
+        return box_statistics(sketch.centroids, sketch.histogram(self.select(key)))
+
+    def teaching_methods(self, key=()):
+        """教学方法实施比例，与 analyze_teaching_methods 相同"""
+        totals = self.totals(self.select(key))
+        return pd.DataFrame([
+            {'方法': method, '实施比例(%)': _percent(totals[col], totals['课程数'])}
+            for method, col in TEACHING_METHODS.items() if col in self.flag_cols
+        ])
+
+
+# 全文检索的列；中文无需分词，直接按单字和相邻两字建立倒排索引
+SEARCH_COLS = ['高校名称', '课程名', '特色做法', '核心教材', '软件工具', '考核内容']
+_BIGRAM_FLAG = 1 << 42
+
+
+class SearchIndex:
+    """文本列的字符 n-gram 倒排索引：单字与二字组 → 包含它的去重文本编号"""
+
+    def __init__(self, df, columns=SEARCH_COLS):
+        self.n_rows = len(df)
+        self.columns = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            texts = [str(value).lower() for value in uniques]
+            self.columns[col] = (codes, texts) + self._build_postings(texts)
+
+    @staticmethod
+    def _build_postings(texts):
+        """向量化提取所有单字和二字组，返回排序后的 n-gram 键、各键起始位置和文本编号"""
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        chars = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        # 相邻两字属于同一文本时组成二字组
+        same_doc = docs[:-1] == docs[1:]
+        bigram_keys = _BIGRAM_FLAG | (chars[:-1][same_doc] << 21) | chars[1:][same_doc]
+        keys = np.concatenate([chars, bigram_keys])
+        key_docs = np.concatenate([docs, docs[:-1][same_doc]])
+
+        order = np.lexsort((key_docs, keys))
+        keys, key_docs = keys[order], key_docs[order]
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (key_docs[1:] != key_docs[:-1])
+        keys, key_docs = keys[distinct], key_docs[distinct]
+
+        gram_keys, starts = np.unique(keys, return_index=True)
+        starts = np.append(starts, len(keys))
+        return gram_keys, starts, key_docs
+
+    @staticmethod
+    def _gram_keys(term):
+        """查询词的 n-gram 键：单字词用单字，多字词用全部二字组"""
+        chars = [ord(ch) for ch in term]
+        if len(chars) == 1:
+            return chars
+        return [_BIGRAM_FLAG | (a << 21) | b for a, b in zip(chars[:-1], chars[1:])]
+
+    def _column_mask(self, col, term):
+        """返回某列包含查询词的行掩码：倒排表求交得到候选，再逐个候选验证子串"""
+        codes, texts, gram_keys, starts, docs = self.columns[col]
+        candidates = None
+        for key in sorted(set(self._gram_keys(term))):
+            pos = np.searchsorted(gram_keys, key)
+            if pos == len(gram_keys) or gram_keys[pos] != key:
+                candidates = np.empty(0, dtype=np.int64)
+                break
+            postings = docs[starts[pos]:starts[pos + 1]]
+            candidates = postings if candidates is None else np.intersect1d(candidates, postings, assume_unique=True)
+            if len(candidates) == 0:
+                break
+
+        matched = np.zeros(len(texts) + 1, dtype=bool)
+        if len(term) > 2:
+            candidates = [doc for doc in candidates if term in texts[doc]]
+        matched[candidates] = True
+        # 编码 -1（空值）落在末尾的 False 上
+        return matched[codes]
+
+    def parse_query(self, query):
+        """按空白拆分为多个关键词（AND），“列名:关键词”限定在某一列中搜索"""
+        terms = []
+        for token in query.split():
+            col, sep, term = token.replace('：', ':').partition(':')
+            if sep and col in self.columns and term:
+                terms.append((col, term.lower()))
+            else:
+                terms.append((None, token.lower()))
+        return terms
+
+    def search(self, query):
+        """返回全量数据集上匹配查询的行掩码；空查询匹配所有行"""
+        mask = np.ones(self.n_rows, dtype=bool)
+        for col, term in self.parse_query(query):
+            cols = [col] if col else list(self.columns)
+            term_mask = np.zeros(self.n_rows, dtype=bool)
+            for search_col in cols:
+                term_mask |= self._column_mask(search_col, term)
+            mask &= term_mask
+        return mask
+
+
+# 特色做法分类：类别 → 关键词（子串匹配，区分大小写）
+# 可通过 PRACTICE_CATEGORIES_FILE 指向同结构的 JSON 文件覆盖，无需修改代码
+DEFAULT_PRACTICE_CATEGORIES = {
+    "👥 小组协作": ["小组汇报", "案例分析", "小组讨论"],
+    "🎯 实践导向": ["软件实操", "数据收集", "论文撰写"],
+    "🤖 技术创新": ["AI", "智能体", "在线平台"],
+    "👨‍🏫 专家分享": ["专家讲座", "学长分享", "跨专业交流"]
+}
+
+# 特色做法多标签分类结果：类别名列表 + 每门课程的类别位掩码（第 i 位对应第 i 个类别）
+PracticeIndex = namedtuple('PracticeIndex', ['labels', 'masks'])
+
+
+def load_practice_categories(path=None):
+    """读取特色做法分类配置，未配置文件时使用默认分类"""
+    path = path or os.environ.get('PRACTICE_CATEGORIES_FILE')
+    if not path:
+        return DEFAULT_PRACTICE_CATEGORIES
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 多模式匹配自动机：扫描一遍文本即可得到命中的全部类别位掩码"""
+
+    def __init__(self, categories):
+        if len(categories) > 63:
+            raise ValueError("特色做法分类最多支持 63 个类别")
+        self.labels = list(categories)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [0]
+
+        # 1. 所有关键词插入字典树，终止节点记录所属类别
+        for bit, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                node = 0
+                for ch in keyword:
+                    if ch not in self.goto[node]:
+                        self.goto[node][ch] = len(self.goto)
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append(0)
+                    node = self.goto[node][ch]
+                self.output[node] |= 1 << bit
+
+        # 2. 按层构建失配指针，并沿失配指针合并输出
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0) if node else 0
+                self.output[child] |= self.output[self.fail[child]]
+
+    def match(self, text):
+        """返回文本命中的类别位掩码"""
+        node = 0
+        mask = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            mask |= self.output[node]
+        return mask
+
+
+def build_practice_index(df, categories=None):
+    """加载时对特色做法做一次多标签分类，返回与数据集行位置对齐的类别位掩码"""
+    automaton = KeywordAutomaton(categories or load_practice_categories())
+    codes, uniques = pd.factorize(df['特色做法'])
+    unique_masks = np.array([automaton.match(str(text)) for text in uniques] + [0], dtype=np.int64)
+    return PracticeIndex(automaton.labels, unique_masks[codes])
+
+
+def select_rows(df, positions):
+    """按行位置取子集；选中全部行时直接返回原数据集，不复制"""
+    if len(positions) == len(df):
+        return df
+    return df.take(positions)
+
+
+# 分析函数
+@profiled
+def analyze_software_tools(df, tool_index=None):
+    """分析软件工具使用情况"""
+    if tool_index is None:
+        tool_index = build_tool_index(df)
+    counts, first_seen = count_tools(tool_index, subset_mask(tool_index.labels, df))
+
+    used = np.flatnonzero(counts)
+    if len(used) == 0:
+        return pd.DataFrame()
+
+    # 统计工具使用频率：按课程数降序，同频按首次出现顺序
+    top = used[np.lexsort((first_seen[used], -counts[used]))][:20]
+
+    tools_df = pd.DataFrame({
+        '软件工具': tool_index.tools[top],
+        '使用课程数': counts[top],
+    })
+
+    # 标记机房已有软件
+    tools_df['状态'] = np.where(tool_index.lab_flags[top], '机房已有', '需补充')
+
+    return tools_df
+
+
+@profiled
+def count_unique_tools(df, tool_index=None):
+    """统计子集中出现的软件种类数"""
+    if tool_index is None:
+        tool_index = build_tool_index(df)
+    counts, _ = count_tools(tool_index, subset_mask(tool_index.labels, df))
+    return int(np.count_nonzero(counts))
+
+
+@profiled
+def analyze_teaching_methods(df):
+    """分析教学方法"""
+    methods_data = []
+
+    # 翻转课堂比例
+    if '是否翻转课堂' in df.columns:
+        flipped_ratio = df['是否翻转课堂'].mean() * 100
+        methods_data.append({'方法': '翻转课堂', '实施比例(%)': flipped_ratio})
+
+    # 软件实操比例
+    if '是否有软件实操' in df.columns:
+        software_ratio = df['是否有软件实操'].mean() * 100
+        methods_data.append({'方法': '软件实操', '实施比例(%)': software_ratio})
+
+    # 开题报告比例
+    if '是否有开题报告' in df.columns:
+        proposal_ratio = df['是否有开题报告'].mean() * 100
+        methods_data.append({'方法': '开题报告', '实施比例(%)': proposal_ratio})
+
+    # 答辩比例
+    if '是否有答辩' in df.columns:
+        defense_ratio = df['是否有答辩'].mean() * 100
+        methods_data.append({'方法': '课程答辩', '实施比例(%)': defense_ratio})
+
+    return pd.DataFrame(methods_data)
+
+
+def build_indexes(df):
+    """构建同一版本数据集的全部加载期索引"""
+    return {
+        'tools': build_tool_index(df),
+        'filters': FilterEngine(df),
+        'cube': AggregateCube(df),
+        'search': SearchIndex(df),
+        'practices': build_practice_index(df),
+        'assessments': build_assessment_index(df),
+    }
+
+
+# 汇总指标：仪表盘各页面展示的统计量，返回普通字典或 DataFrame，由调用方负责格式化
+def summarize_overview(df):
+    """顶部指标：高校数、平均学时、翻转课堂和软件实操比例"""
+    return {
+        '调研高校数': int(df['高校名称'].nunique()),
+        '平均学时': df['学时'].mean(),
+        '翻转课堂比例': df['是否翻转课堂'].mean() * 100,
+        '软件实操比例': df['是否有软件实操'].mean() * 100,
+    }
+
+
+def summarize_short_hour_courses(df, max_hours=32):
+    """短学时课程特点；没有短学时课程时返回 None"""
+    short_hour_courses = df[df['学时'] <= max_hours]
+    if short_hour_courses.empty:
+        return None
+    return {
+        '短学时课程数': len(short_hour_courses),
+        '平均学分': short_hour_courses['学分'].mean(),
+        '翻转课堂比例': short_hour_courses['是否翻转课堂'].mean() * 100,
+        '软件实操比例': short_hour_courses['是否有软件实操'].mean() * 100,
+    }
+
+
+def summarize_software_courses(df, tool_index=None):
+    """软件实操课程特点；没有软件实操课程时只返回课程数"""
+    software_courses = df[df['是否有软件实操']]
+    summary = {'开设软件课程': len(software_courses), '课程总数': len(df)}
+    if not software_courses.empty:
+        summary['平均学时'] = software_courses['学时'].mean()
+        summary['软件种类'] = count_unique_tools(software_courses, tool_index)
+        summary['翻转课堂比例'] = software_courses['是否翻转课堂'].mean() * 100
+    return summary
+
+
+def count_categories(df, col):
+    """分类列各取值的课程数，去掉计数为零的类别"""
+    counts = df[col].value_counts()
+    return counts[counts > 0]
+
+
+@profiled
+def count_assessment_methods(df, assessment_index=None, top=10):
+    """最常见的考核成分：包含该成分的课程数，以及写明百分比的课程中该成分的平均权重"""
+    if assessment_index is None:
+        assessment_index = build_assessment_index(df)
+    counts, weight_counts, weight_sums, first_seen = count_components(
+        assessment_index, subset_mask(assessment_index.labels, df)
+    )
+
+    used = np.flatnonzero(counts)
+    # 按课程数降序，同频按首次出现顺序
+    top_ids = used[np.lexsort((first_seen[used], -counts[used]))][:top]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average_weights = weight_sums[top_ids] / weight_counts[top_ids]
+    return pd.DataFrame({
+        '考核方式': assessment_index.components[top_ids],
+        '频次': counts[top_ids],
+        '平均权重(%)': average_weights,
+    })
+
+
+# 考核权重散点的服务端分箱：每个坐标轴最多 WEIGHT_BINS 个箱，图表点数与行数无关
+WEIGHT_BINS = 40
+
+
+def _weight_edges(values, bins):
+    """分箱边界：取值跨度不超过箱数时按整数单位分箱，整数权重的位置保持精确"""
+    low, high = np.floor(values.min()), np.floor(values.max()) + 1
+    if high - low <= bins:
+        return np.arange(low, high + 1)
+    return np.linspace(low, high, bins + 1)
+
+
+def bin_weight_pairs(df, bins=WEIGHT_BINS):
+    """按 (平时权重, 期末权重) 做二维直方图，返回非空箱的平均位置、课程数和平均学时"""
+    columns = ['平时权重', '期末权重', '课程数', '平均学时']
+    usual = df['平时权重'].to_numpy(dtype='float64')
+    final = df['期末权重'].to_numpy(dtype='float64')
+    if not len(usual):
+        return pd.DataFrame(columns=columns)
+
+    edges = [_weight_edges(usual, bins), _weight_edges(final, bins)]
+    counts = np.histogram2d(usual, final, bins=edges)[0]
+    # 同一组边界上以坐标和学时为权重再做直方图，得到每个箱的坐标和、学时和
+    sums = {
+        name: np.histogram2d(usual, final, bins=edges, weights=values)[0]
+        for name, values in [('平时权重', usual), ('期末权重', final)]
+    }
+    if '学时' in df.columns:
+        sums['平均学时'] = np.histogram2d(usual, final, bins=edges, weights=df['学时'].to_numpy(dtype='float64'))[0]
+
+    filled = counts > 0
+    binned = pd.DataFrame({name: total[filled] / counts[filled] for name, total in sums.items()})
+    binned['课程数'] = counts[filled].astype('int64')
+    return binned.reindex(columns=[col for col in columns if col in binned.columns])
+
+
+def count_practice_categories(df, positions, practice_index):
+    """各特色做法类别的课程数；positions 为 df 各行在完整数据集中的位置"""
+    special_mask = (df['特色做法'] != '未提供').to_numpy()
+    category_masks = practice_index.masks[positions][special_mask]
+    return pd.DataFrame({
+        '类别': practice_index.labels,
+        '课程数': [int(np.count_nonzero((category_masks >> bit) & 1)) for bit in range(len(practice_index.labels))],
+    })
+
+
+def compute_aggregates(df, indexes=None):
+    """计算仪表盘全部页面的汇总结果（不加筛选），返回 名称 → 字典或 DataFrame"""
+    if indexes is None:
+        indexes = build_indexes(df)
+    positions = np.arange(len(df))
+
+    aggregates = {
+        'overview': summarize_overview(df),
+        'hour_distribution': count_categories(df, '学时分层').rename_axis('学时分层').reset_index(name='课程数'),
+        'mode_distribution': count_categories(df, '教学模式').rename_axis('教学模式').reset_index(name='课程数'),
+        'class_size': df['课堂规模'].describe().rename_axis('统计量').reset_index(name='课堂规模'),
+        'teaching_methods': analyze_teaching_methods(df),
+        'software_tools': analyze_software_tools(df, indexes['tools']),
+        'software_courses': summarize_software_courses(df, indexes['tools']),
+        'assessment_weights': df.groupby(['平时权重', '期末权重']).size().reset_index(name='课程数'),
+        'assessment_methods': count_assessment_methods(df, indexes['assessments']),
+        'practice_categories': count_practice_categories(df, positions, indexes['practices']),
+        'data_summary': summarize_display(df),
+    }
+    short_hour = summarize_short_hour_courses(df)
+    if short_hour is not None:
+        aggregates['short_hour_courses'] = short_hour
+    return aggregates
+
+
+# 后台重新加载：轮询数据源状态，变化时在后台线程中重新导入并构建索引，完成后整体替换
+RELOAD_INTERVAL = float(os.environ.get('COURSE_RELOAD_INTERVAL', '5'))
+# 共享数据集：预处理结果写为未压缩的 Arrow 文件再以内存映射读回，数值列和文本列直接引用映射页面，
+# 所有会话共享同一份只读数据，由操作系统页缓存承载而不占用进程的匿名内存
+MAP_DATASET = os.environ.get('COURSE_MAP_DATASET', '1') != '0'
+
+
+def map_frame(df, path):
+    """将数据集写为 Arrow IPC 文件并以内存映射方式读回只读的 DataFrame；失败时返回原数据"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(_to_storable(df), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        # split_blocks 使每列单独成块，无空值的数值列不需要合并复制
+        return table.to_pandas(split_blocks=True)
+    except Exception:
+        return df
+
+
+def _remove_mapped_files(pattern, keep):
+    """删除旧版本的映射文件；仍在使用的映射在 POSIX 上不受影响，删除失败时留待下次"""
+    for path in glob.glob(pattern):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# 一个版本的数据集：版本标识、替换序号、预处理后的数据、加载期索引和对应的数据源状态
+Dataset = namedtuple('Dataset', ['version', 'number', 'df', 'indexes', 'stat'])
+
+
+class DatasetReloader:
+    """后台线程监视数据源，变化时重新导入数据并构建索引，完成后整体替换 current
+
+    读取方在一次请求开始时取一次 current 并全程使用；替换只是一次引用赋值，
+    进行中的请求继续使用旧版本，任何请求都不会等待重新导入。
+    """
+
+    def __init__(self, source=DATA_FILE, interval=RELOAD_INTERVAL, sheet_patterns=SHEET_PATTERNS,
+                 mapped=MAP_DATASET):
+        self.source = source
+        self.interval = interval
+        self.sheet_patterns = sheet_patterns
+        self.mapped = mapped
+        self.current = None
+        self.error = None
+        self._failed_stat = None
+        self._loaded = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台线程（首次加载也在该线程中进行）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='dataset-reloader', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def wait(self, timeout=None):
+        """等待首次加载结束（无论成功与否），返回当前数据集"""
+        self._loaded.wait(timeout)
+        return self.current
+
+    def refresh(self):
+        """数据源状态变化时重新加载并替换；返回是否替换了数据集"""
+        stat = source_stat(self.source)
+        current = self.current
+        if (current is not None and current.stat == stat) or stat == self._failed_stat:
+            return False
+        version = _stat_version(stat)
+        try:
+            df = read_source(self.source, self.sheet_patterns)
+            if self.mapped:
+                prefix = os.path.join(CACHE_DIR, f"dataset_{_source_key(self.source, self.sheet_patterns)}_")
+                df = map_frame(df, f"{prefix}{version}.arrow")
+                _remove_mapped_files(f"{prefix}*.arrow", f"{prefix}{version}.arrow")
+            indexes = build_indexes(df)
+        except Exception:
+            # 同一状态的数据源不再重试，等文件再次变化
+            self._failed_stat = stat
+            raise
+        number = current.number + 1 if current is not None else 1
+        self.current = Dataset(version, number, df, indexes, stat)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+                self.error = None
+            except Exception as e:
+                self.error = e
+            self._loaded.set()
+            if self.interval <= 0 or self._stopped.wait(self.interval):
+                return
+
+
+# 按总大小限制的 LRU 缓存，仪表盘用于共享图表和导出文件
+class SizedLRUCache:
+    """跨会话共享的 LRU 缓存，按条目大小之和限制总容量"""
+
+    def __init__(self, max_bytes, size_of):
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build, *args):
+        """命中时直接返回缓存值，否则构建、记录大小并按 LRU 淘汰"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        value = build(*args)
+        size = self.size_of(value) if value is not None else 0
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+
+# 详细数据分页：排序和切片在服务端完成，只有当前页需要序列化
+def sort_positions(df, col, ascending=True):
+    """按一列稳定排序后的行位置；空值排在最后"""
+    values = pd.Series(df[col].array)
+    return values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+def page_slice(df, page, page_rows, order=None):
+    """第 page 页（从 0 开始）的行；order 为排序后的行位置，None 表示原始顺序"""
+    start = page * page_rows
+    if order is None:
+        return df.iloc[start:start + page_rows]
+    return df.take(order[start:start + page_rows])
+
+
+# 数据导出
+def summarize_display(display_data):
+    """详细数据页的统计摘要：记录数以及学时、权重均值"""
+    summary = {'显示记录数': len(display_data)}
+    for col, label in [('学时', '平均学时'), ('平时权重', '平时权重均值'), ('期末权重', '期末权重均值')]:
+        if col in display_data.columns:
+            summary[label] = display_data[col].mean()
+    return summary
+
+
+def _excel_value(value):
+    """转换为 openpyxl 可写入的单元格值，空值写为空单元格"""
+    return None if pd.isna(value) else value
+
+
+def _write_xlsx(df, buffer):
+    """用 openpyxl 只写模式逐行流式写出“课程数据”和“统计摘要”两个工作表"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+
+    data_sheet = workbook.create_sheet('课程数据')
+    data_sheet.append([str(col) for col in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        data_sheet.append([_excel_value(value) for value in row])
+
+    summary_sheet = workbook.create_sheet('统计摘要')
+    summary_sheet.append(['指标', '数值'])
+    for label, value in summarize_display(df).items():
+        summary_sheet.append([label, _excel_value(value)])
+    summary_sheet.append(['导出时间', datetime.now().strftime('%Y-%m-%d %H:%M')])
+
+    workbook.save(buffer)
+
+
+def export_frame(df, fmt):
+    """将数据导出为指定格式的字节串，直接写入内存缓冲区，不生成中间字符串"""
+    buffer = io.BytesIO()
+    if fmt == 'csv':
+        df.to_csv(buffer, index=False, encoding='utf-8-sig')
+    elif fmt == 'parquet':
+        df.to_parquet(buffer, index=False)
+    elif fmt == 'xlsx':
+        _write_xlsx(df, buffer)
+    else:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    return buffer.getvalue()
@@ -1,13 +1,16 @@
-
-
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
-from collections import Counter
-import re
+from collections import deque
+import json
+import os
+import threading
+from analytics import (
+    DATA_FILE, DatasetReloader, RerunProfiler, SizedLRUCache, analyze_software_tools,
+    export_frame, page_slice, profile_section, select_rows, sort_positions, summarize_display,
+    summarize_software_courses, to_display_labels, use_profiler,
+)
 
 # 页面配置
 st.set_page_config(
@@ -78,844 +81,795 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# 数据处理函数
-def preprocess_data(df):
-    """根据你的数据特点进行预处理"""
-    df_clean = df.copy()
-
-    # 1. 处理数值字段
-    numeric_cols = ['学分', '学时', '课堂规模']
-    for col in numeric_cols:
-        if col in df_clean.columns:
-            # 转换数据类型，处理空值和特殊值
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-            # 用中位数填充缺失值
-            median_val = df_clean[col].median() if not df_clean[col].isna().all() else 0
-            df_clean[col] = df_clean[col].fillna(median_val)
-
-    # 2. 处理权重字段（基于你的数据特点）
-    def extract_weight_from_text(weight_text):
-        """从权重文本中提取数值"""
-        if pd.isna(weight_text) or weight_text in ['0', '无', '', ' ']:
-            return 50, 50  # 默认值
-
-        text = str(weight_text)
-
-        # 处理 "40/60" 这种格式
-        if '/' in text:
-            parts = text.split('/')
-            if len(parts) == 2:
-                try:
-                    usual = int(parts[0].strip())
-                    final = int(parts[1].strip())
-                    return usual, final
-                except:
-                    pass
-
-        # 处理 "20/80" 这种格式
-        if '/' in text:
-            parts = text.split('/')
-            if len(parts) == 2:
-                try:
-                    usual = int(parts[0].strip())
-                    final = int(parts[1].strip())
-                    return usual, final
-                except:
-                    pass
-
-        # 处理 "60/40" 这种格式
-        if '/' in text and text != '0':
-            parts = text.split('/')
-            if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
-                return int(parts[0]), int(parts[1])
-
-        return 50, 50  # 默认值
-
-    # 提取权重
-    weight_info = df_clean['平时/期末权重'].apply(extract_weight_from_text)
-    df_clean['平时权重'] = [w[0] for w in weight_info]
-    df_clean['期末权重'] = [w[1] for w in weight_info]
-
-    # 3. 处理布尔字段
-    bool_cols = ['是否翻转课堂', '是否有软件实操', '是否有开题报告', '是否有答辩']
-    bool_mapping = {
-        '是': '是', '有': '是', 'yes': '是', 'Yes': '是',
-        '否': '否', '无': '否', 'no': '否', 'No': '否', '': '否'
-    }
+# 性能分析（可选）：DASHBOARD_PROFILE=time 记录各区段耗时，=memory 额外记录 tracemalloc 内存峰值
+# 也可以通过 URL 参数 ?profile=time / ?profile=memory 对单个会话开启
+PROFILE_MODE = os.environ.get('DASHBOARD_PROFILE', '')
+PROFILE_TRACE_FILE = os.environ.get('DASHBOARD_PROFILE_TRACE', os.path.join('.cache', 'profile_trace.jsonl'))
+PROFILE_HISTORY = 200
 
-    for col in bool_cols:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].fillna('否')
-            df_clean[col] = df_clean[col].apply(
-                lambda x: bool_mapping.get(str(x).strip(), '否')
-            )
 
-    # 4. 处理文本字段
-    text_cols = ['特色做法', '核心教材', '软件工具', '考核内容']
-    for col in text_cols:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].fillna('未提供')
-            # 替换0为"未提供"
-            df_clean[col] = df_clean[col].replace({'0': '未提供', '无': '未提供'})
-
-    # 5. 分类字段处理
-    categorical_cols = ['教学模式', '面向层次']
-    for col in categorical_cols:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].fillna('未知')
-
-    # 6. 创建学时分层
-    if '学时' in df_clean.columns:
-        df_clean['学时分层'] = pd.cut(
-            df_clean['学时'],
-            bins=[0, 32, 48, 100],
-            labels=['短学时(≤32)', '中学时(33-48)', '长学时(>48)'],
-            right=False
-        )
+# 数据加载：所有会话共享一个后台加载器，数据源变化时在后台重新导入并整体替换数据集
+@st.cache_resource
+def get_reloader(path=DATA_FILE):
+    """启动并返回共享的数据集加载器"""
+    return DatasetReloader(path).start()
 
-    return df_clean
 
+# 筛选结果缓存的总大小上限
+VIEW_CACHE_MB = float(os.environ.get('VIEW_CACHE_MB', '128'))
 
-# 数据加载函数
-@st.cache_data
-def load_data():
-    """加载并处理数据"""
-    try:
-        # 读取Excel文件
-        df = pd.read_excel("双一流高校课程开设情况.xlsx", sheet_name='Sheet1')
 
-        # 清理列名（去除空格等）
-        df.columns = df.columns.str.strip()
+@st.cache_resource
+def get_view_cache():
+    """所有会话共享的筛选结果缓存，大小按数据字节数计"""
+    return SizedLRUCache(int(VIEW_CACHE_MB * 1024 * 1024), lambda frame: int(frame.memory_usage(deep=True).sum()))
 
-        # 预处理数据
-        df = preprocess_data(df)
 
-        return df
-    except Exception as e:
-        st.error(f"数据加载失败: {str(e)}")
-        return pd.DataFrame()
+def load_dataset():
+    """取当前版本的数据集；只有服务启动后的首次加载需要等待"""
+    reloader = get_reloader()
+    dataset = reloader.current
+    if dataset is None:
+        with st.spinner("正在加载数据..."):
+            dataset = reloader.wait()
+    if reloader.error is not None:
+        if dataset is None:
+            st.error(f"数据加载失败: {str(reloader.error)}")
+        else:
+            st.warning(f"数据更新失败，继续显示上一版本: {str(reloader.error)}")
+    return dataset
 
 
-# 分析函数
-def analyze_software_tools(df):
-    """分析软件工具使用情况"""
-    all_tools = []
-    for tools in df['软件工具'].dropna():
-        if tools != '未提供':
-            # 分割多种工具
-            for tool in str(tools).split(','):
-                for t in tool.split('、'):
-                    clean_tool = t.strip()
-                    if clean_tool and clean_tool != '无':
-                        all_tools.append(clean_tool)
-
-    if not all_tools:
-        return pd.DataFrame()
-
-    # 统计工具使用频率
-    tool_counts = Counter(all_tools)
-    top_tools = tool_counts.most_common(20)
-
-    tools_df = pd.DataFrame(top_tools, columns=['软件工具', '使用课程数'])
-
-    # 标记机房已有软件
-    lab_has = ['SPSS', 'Stata', 'Excel']
-    tools_df['状态'] = tools_df['软件工具'].apply(
-        lambda x: '机房已有' if any(lab_tool.lower() in str(x).lower() for lab_tool in lab_has) else '需补充'
-    )
+# 页面渲染模式：lazy（默认）只计算当前选中的页面；tabs 使用 st.tabs 每次渲染全部页面
+TAB_MODE = os.environ.get('DASHBOARD_TAB_MODE', 'lazy')
+# 图表缓存的总大小上限（按估计的序列化字节数计）
+FIGURE_CACHE_MB = float(os.environ.get('FIGURE_CACHE_MB', '64'))
 
-    return tools_df
 
+@st.cache_resource
+def get_figure_cache():
+    """所有会话共享的图表缓存，大小按 figures.figure_size 估计的序列化字节数计"""
+    import figures
 
-def analyze_teaching_methods(df):
-    """分析教学方法"""
-    methods_data = []
+    return SizedLRUCache(int(FIGURE_CACHE_MB * 1024 * 1024), figures.figure_size)
 
-    # 翻转课堂比例
-    if '是否翻转课堂' in df.columns:
-        flipped_ratio = (df['是否翻转课堂'] == '是').mean() * 100
-        methods_data.append({'方法': '翻转课堂', '实施比例(%)': flipped_ratio})
 
-    # 软件实操比例
-    if '是否有软件实操' in df.columns:
-        software_ratio = (df['是否有软件实操'] == '是').mean() * 100
-        methods_data.append({'方法': '软件实操', '实施比例(%)': software_ratio})
+def show_figure(view_key, figure_id, *args):
+    """按 (数据集版本, 筛选条件, 图表编号) 取缓存的图表并渲染；图表由 figures.build_<图表编号>_figure 构建
 
-    # 开题报告比例
-    if '是否有开题报告' in df.columns:
-        proposal_ratio = (df['是否有开题报告'] == '是').mean() * 100
-        methods_data.append({'方法': '开题报告', '实施比例(%)': proposal_ratio})
+    Plotly 较重，只在第一次需要构建图表时随 figures 模块导入，不拖慢服务的冷启动。
+    """
+    import figures
 
-    # 答辩比例
-    if '是否有答辩' in df.columns:
-        defense_ratio = (df['是否有答辩'] == '是').mean() * 100
-        methods_data.append({'方法': '课程答辩', '实施比例(%)': defense_ratio})
+    build = getattr(figures, f'build_{figure_id}_figure')
+    with profile_section(f'图表:{figure_id}'):
+        fig = get_figure_cache().get_or_build(view_key + (figure_id,), build, *args)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
 
-    return pd.DataFrame(methods_data)
 
+# 数据导出：点击下载时才生成文件，结果按条件缓存
+EXPORT_CACHE_MB = float(os.environ.get('EXPORT_CACHE_MB', '256'))
+# 格式 → (按钮文字, 扩展名, MIME 类型)
+EXPORT_FORMATS = {
+    'csv': ("📥 下载当前数据 (CSV)", 'csv', 'text/csv'),
+    'parquet': ("📥 下载当前数据 (Parquet)", 'parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ("📥 下载当前数据 (Excel)", 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
 
-# 主应用
-def main():
-    # 标题
-    st.markdown('<h1 class="main-header">📊 管理研究方法论课程</h1>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_export_cache():
+    """所有会话共享的导出文件缓存，大小按文件字节数计"""
+    return SizedLRUCache(int(EXPORT_CACHE_MB * 1024 * 1024), len)
 
-    # 加载数据
-    df = load_data()
 
-    if df.empty:
-        st.warning("请确保 '双一流高校课程开设情况.xlsx' 文件在当前目录，且包含名为 'Sheet1' 的工作表")
-        return
+def export_display(display_data, fmt):
+    """导出详细数据页的当前结果，布尔字段写为是/否标签"""
+    return export_frame(to_display_labels(display_data), fmt)
 
-    # 显示基本统计
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("调研高校数", df['高校名称'].nunique())
-    with col2:
-        avg_hours = df['学时'].mean()
-        st.metric("平均学时", f"{avg_hours:.1f}")
-    with col3:
-        flipped_pct = (df['是否翻转课堂'] == '是').mean() * 100
-        st.metric("翻转课堂比例", f"{flipped_pct:.1f}%")
-    with col4:
-        software_pct = (df['是否有软件实操'] == '是').mean() * 100
-        st.metric("软件实操比例", f"{software_pct:.1f}%")
 
-    st.markdown("---")
+# 详细数据表：结果超过一页时在服务端排序、分页，只把当前页发送到浏览器
+DATA_TABLE_PAGE_ROWS = int(os.environ.get('DATA_TABLE_PAGE_ROWS', '500'))
+DATA_TABLE_CACHE_MB = float(os.environ.get('DATA_TABLE_CACHE_MB', '64'))
+ORIGINAL_ORDER = '原始顺序'
 
-    # 侧边栏筛选器
-    st.sidebar.header("🔍 数据筛选")
 
-    # 高校筛选
-    universities = sorted(df['高校名称'].dropna().unique())
-    selected_unis = st.sidebar.multiselect(
-        "选择高校",
-        universities,
-        default=universities
-    )
+def _table_entry_size(value):
+    """表格缓存条目的字节数：排序位置数组或分页数据"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return int(value.memory_usage(deep=True).sum())
 
-    # 学时筛选
-    if '学时' in df.columns:
-        min_hours, max_hours = int(df['学时'].min()), int(df['学时'].max())
-        hour_range = st.sidebar.slider(
-            "学时范围",
-            min_hours, max_hours,
-            (min_hours, max_hours)
-        )
 
-    # 教学模式筛选
-    if '教学模式' in df.columns:
-        methods = df['教学模式'].dropna().unique()
-        selected_methods = st.sidebar.multiselect(
-            "教学模式",
-            methods,
-            default=list(methods)
-        )
+@st.cache_resource
+def get_table_cache():
+    """所有会话共享的排序位置与分页缓存"""
+    return SizedLRUCache(int(DATA_TABLE_CACHE_MB * 1024 * 1024), _table_entry_size)
 
-    # 应用筛选
-    filtered_df = df.copy()
-    if selected_unis:
-        filtered_df = filtered_df[filtered_df['高校名称'].isin(selected_unis)]
-    if '学时' in df.columns:
-        filtered_df = filtered_df[(filtered_df['学时'] >= hour_range[0]) & (filtered_df['学时'] <= hour_range[1])]
-    if '教学模式' in df.columns and selected_methods:
-        filtered_df = filtered_df[filtered_df['教学模式'].isin(selected_methods)]
-    #xinsheng
-    st.sidebar.markdown("---")
-    with st.sidebar.expander("★ 致新生的一封信", expanded=False):
-        st.markdown("""
-        <div style="text-indent: 2em; line-height: 1.6; font-size: 14px; color: #4B5563;">
-        亲爱的同学们：
 
-        欢迎踏上管理研究方法的学习之旅！作为一门连接理论与实践、思维与工具的核心课程，《管理研究方法论》不仅是学术研究的基石，更是未来职场竞争力的重要支撑。
+def build_table_page(display_data, page, order):
+    """一页展示数据，布尔字段还原为是/否标签"""
+    return to_display_labels(page_slice(display_data, page, DATA_TABLE_PAGE_ROWS, order))
 
-        在这门课程中，你将不再是被动的知识接受者，而是主动的研究探索者。通过对比16所一流高校的教学实践，我们发现：成功的学习者往往具备三个特质——<strong>好奇心</strong>、<strong>执行力</strong>、<strong>协作力</strong>。
 
-        32学时的课程虽然紧凑，但我们已经为你规划了清晰的路线图。记住，软件操作只是工具，研究思维才是核心。当你完成第一个数据分析、撰写第一篇研究方案时，那种创造的成就感将远超任何考试分数。
+def table_page(display_data, result_key):
+    """超过一页时显示排序和页码控件，返回当前页；排序位置和分页按 (结果, 排序, 页码) 缓存"""
+    total = len(display_data)
+    if total <= DATA_TABLE_PAGE_ROWS:
+        return to_display_labels(display_data)
 
-        让我们携手开启这段探索之旅，在学习中发现研究的乐趣，在挑战中收获成长的喜悦！
-        </div>
-
-        <div style="text-align: right; font-style: italic; margin-top: 15px; color: #6B7280;">
-        —— 你的学长学姐们
-        </div>
-        """, unsafe_allow_html=True)
+    table_cache = get_table_cache()
+    n_pages = -(-total // DATA_TABLE_PAGE_ROWS)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_col = st.selectbox("排序列", [ORIGINAL_ORDER] + display_data.columns.tolist())
+    with col2:
+        ascending = st.radio("排序方向", ['升序', '降序'], horizontal=True) == '升序'
+    with col3:
+        page = st.number_input("页码", min_value=1, max_value=n_pages, value=1, step=1) - 1
+    st.caption(f"共 {total:,} 条记录，第 {page + 1}/{n_pages} 页，每页 {DATA_TABLE_PAGE_ROWS} 条")
+
+    order = None
+    sort_key = ()
+    if sort_col != ORIGINAL_ORDER:
+        sort_key = (sort_col, ascending)
+        order = table_cache.get_or_build(
+            result_key + ('order',) + sort_key, sort_positions, display_data, sort_col, ascending
+        )
+    return table_cache.get_or_build(
+        result_key + ('page',) + sort_key + (page,), build_table_page, display_data, page, order
+    )
 
-    # 创建标签页
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "🏫 课程概览",
-        "🛠️ 软件工具",
-        "📊 考核评估",
-        "✨ 特色做法",
-        "📋 详细数据",
-        "💡 课程建议",
-    ])
 
-    # TAB 1: 课程概览
-    with tab1:
-        st.markdown('<h2 class="sub-header">🏫 课程基本信息分析</h2>', unsafe_allow_html=True)
+# 课程列表：分页渲染，每页只为当前页的课程生成元素；结果较多时默认以紧凑表格显示
+COURSE_LIST_PAGE_ROWS = int(os.environ.get('COURSE_LIST_PAGE_ROWS', '20'))
+COURSE_LIST_TABLE_ROWS = int(os.environ.get('COURSE_LIST_TABLE_ROWS', '200'))
 
-        col1, col2 = st.columns(2)
 
+def paginated_list(frame, columns, render_item, key):
+    """分页的课程列表：当前页的行按 columns 取为元组传给 render_item，不逐行构造 Series"""
+    columns = [col for col in columns if col in frame.columns]
+    total = len(frame)
+    n_pages = -(-total // COURSE_LIST_PAGE_ROWS)
+    page, as_table = 0, False
+    if n_pages > 1:
+        col1, col2 = st.columns([1, 3])
         with col1:
-            # 学时分布
-            if '学时分层' in filtered_df.columns:
-                hour_dist = filtered_df['学时分层'].value_counts()
-                fig1 = px.pie(
-                    values=hour_dist.values,
-                    names=hour_dist.index,
-                    title='课程学时分布',
-                    color_discrete_sequence=px.colors.sequential.Blues_r,
-                    hole=0.4
-                )
-                fig1.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig1, use_container_width=True)
-
-            # 教学模式分布
-            if '教学模式' in filtered_df.columns:
-                mode_dist = filtered_df['教学模式'].value_counts()
-                fig2 = px.bar(
-                    x=mode_dist.index,
-                    y=mode_dist.values,
-                    title='教学模式分布',
-                    labels={'x': '教学模式', 'y': '课程数'},
-                    color=mode_dist.values,
-                    color_continuous_scale='Viridis'
-                )
-                st.plotly_chart(fig2, use_container_width=True)
-
+            # 键中包含结果行数：筛选结果变化后回到第一页
+            page = st.number_input(
+                "页码", min_value=1, max_value=n_pages, value=1, step=1, key=f'{key}_page_{total}'
+            ) - 1
         with col2:
-            # 课堂规模分析
-            if '课堂规模' in filtered_df.columns:
-                fig3 = px.box(
-                    filtered_df,
-                    y='课堂规模',
-                    title='课堂规模分布',
-                    points='all'
-                )
-                fig3.update_layout(showlegend=False)
-                st.plotly_chart(fig3, use_container_width=True)
-
-            # 教学方法实施情况
-            methods_df = analyze_teaching_methods(filtered_df)
-            if not methods_df.empty:
-                fig4 = px.bar(
-                    methods_df,
-                    x='方法',
-                    y='实施比例(%)',
-                    title='教学方法实施比例',
-                    color='实施比例(%)',
-                    color_continuous_scale='Teal',
-                    text='实施比例(%)'
-                )
-                fig4.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
-                st.plotly_chart(fig4, use_container_width=True)
-
-        # 短学时课程分析
-        st.markdown("##### 🎯 短学时(≤32)课程特点分析")
-        short_hour_courses = filtered_df[filtered_df['学时'] <= 32]
-
-        if not short_hour_courses.empty:
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("短学时课程数", len(short_hour_courses))
-            with col2:
-                avg_credit = short_hour_courses['学分'].mean()
-                st.metric("平均学分", f"{avg_credit:.1f}")
-            with col3:
-                flipped_ratio = (short_hour_courses['是否翻转课堂'] == '是').mean() * 100
-                st.metric("翻转课堂比例", f"{flipped_ratio:.1f}%")
-            with col4:
-                software_ratio = (short_hour_courses['是否有软件实操'] == '是').mean() * 100
-                st.metric("软件实操比例", f"{software_ratio:.1f}%")
-
-            # 短学时课程应对策略
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**💡 短学时课程应对策略建议：**")
-            st.markdown("""
-            1. **课前准备**：提前阅读教材1-3章，安装所需软件
-            2. **重点突出**：聚焦研究方法核心模块
-            3. **项目驱动**：用小项目贯穿学习全过程
-            4. **混合学习**：线上资源辅助课堂教学
-            5. **小组协作**：分组完成研究设计任务
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
+            as_table = st.toggle("以表格显示", value=total > COURSE_LIST_TABLE_ROWS, key=f'{key}_table')
+        st.caption(f"共 {total:,} 门课程，第 {page + 1}/{n_pages} 页")
 
-    # TAB 2: 软件工具
-    with tab2:
+    start = page * COURSE_LIST_PAGE_ROWS
+    page_frame = frame.iloc[start:start + COURSE_LIST_PAGE_ROWS][columns]
+    if as_table:
+        st.dataframe(to_display_labels(page_frame), use_container_width=True, hide_index=True)
+        return
+    for record in page_frame.itertuples(index=False, name=None):
+        render_item(*record)
 
-        st.markdown('<h2 class="sub-header">🛠️ 软件工具使用分析</h2>', unsafe_allow_html=True)
 
-        # 软件工具分析
-        tools_df = analyze_software_tools(filtered_df)
+# TAB 1: 课程概览
+def render_overview_tab(cube, view_key):
+    """课程概览：学时、教学模式、课堂规模和教学方法
 
-        if not tools_df.empty:
-            col1, col2 = st.columns([3, 1])
+    分组计数类的图表和指标直接查询预聚合立方体，view_key[1] 即规范化后的筛选条件。
+    """
+    filter_key = view_key[1]
+    st.markdown('<h2 class="sub-header">🏫 课程基本信息分析</h2>', unsafe_allow_html=True)
 
-            with col1:
-                # 软件使用频率
-                fig_tools = px.bar(
-                    tools_df,
-                    x='软件工具',
-                    y='使用课程数',
-                    color='状态',
-                    title='软件工具使用情况',
-                    color_discrete_map={'机房已有': '#10B981', '需补充': '#3B82F6'},
-                    text='使用课程数'
-                )
-                fig_tools.update_layout(xaxis_tickangle=-45, height=400)
-                st.plotly_chart(fig_tools, use_container_width=True)
-
-            with col2:
-                st.markdown('<div class="card">', unsafe_allow_html=True)
-                st.markdown("**📊 软件使用统计**")
-
-                total_courses = len(filtered_df)
-                software_courses = (filtered_df['是否有软件实操'] == '是').sum()
-                st.metric("开设软件课程", f"{software_courses}/{total_courses}")
-
-                st.markdown("**💡 学习建议：**")
-                st.markdown("""
-                1. **SPSS** - 必学（7门课程使用）
-                2. **Stata** - 重点（4门课程使用）
-                3. **AI工具** - 新兴（2门课程使用）
-                4. **Python** - 进阶（自主补充）
-                """)
-                st.markdown('</div>', unsafe_allow_html=True)
-        else:
-            st.warning("暂无软件工具使用数据")
-
-        # 软件实操课程分析
-        st.markdown("##### 💻 软件实操课程特点")
-
-        software_courses = filtered_df[filtered_df['是否有软件实操'] == '是']
-
-        if not software_courses.empty:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                avg_hours = software_courses['学时'].mean()
-                st.metric("平均学时", f"{avg_hours:.1f}")
-            with col2:
-                software_tools = software_courses['软件工具'].tolist()
-                unique_tools = set()
-                for tools in software_tools:
-                    if tools != '未提供':
-                        for tool in str(tools).split(','):
-                            for t in tool.split('、'):
-                                clean_tool = t.strip()
-                                if clean_tool and clean_tool != '无':
-                                    unique_tools.add(clean_tool)
-                st.metric("软件种类", len(unique_tools))
-            with col3:
-                flipped_ratio = (software_courses['是否翻转课堂'] == '是').mean() * 100
-                st.metric("翻转课堂比例", f"{flipped_ratio:.1f}%")
-
-            # 显示软件课程列表
-            with st.expander("📋 查看开设软件实操的课程"):
-                for _, row in software_courses.iterrows():
-                    st.markdown(f"**{row['高校名称']}** - {row['课程名']}")
-                    st.markdown(f"软件工具：{row['软件工具']}")
-                    st.markdown(f"学时：{int(row['学时'])} | 教学模式：{row['教学模式']}")
-                    st.markdown("---")
-
-    # TAB 3: 考核评估
-    with tab3:
-        st.markdown('<h2 class="sub-header">📊 考核评估方式分析</h2>', unsafe_allow_html=True)
-
-        col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-        with col1:
-            # 考核权重分布
-            if '平时权重' in filtered_df.columns and '期末权重' in filtered_df.columns:
-                # 创建散点图
-                fig_weight = px.scatter(
-                    filtered_df,
-                    x='平时权重',
-                    y='期末权重',
-                    title='考核权重分布',
-                    labels={'平时权重': '平时成绩权重(%)', '期末权重': '期末成绩权重(%)'},
-                    hover_data=['高校名称', '课程名', '学时'],
-                    color='学时',
-                    size='学时',
-                    size_max=20,
-                    color_continuous_scale='Viridis'
-                )
+    with col1:
+        # 学时分布
+        show_figure(view_key, 'hour_distribution', cube, filter_key)
 
-                # 添加对角线
-                fig_weight.add_shape(
-                    type="line",
-                    x0=0, y0=100, x1=100, y1=0,
-                    line=dict(color="Red", width=2, dash="dash")
-                )
+        # 教学模式分布
+        show_figure(view_key, 'mode_distribution', cube, filter_key)
+
+    with col2:
+        # 课堂规模分析
+        show_figure(view_key, 'class_size', cube, filter_key)
 
-                st.plotly_chart(fig_weight, use_container_width=True)
+        # 教学方法实施情况
+        show_figure(view_key, 'teaching_methods', cube, filter_key)
 
+    # 短学时课程分析
+    st.markdown("##### 🎯 短学时(≤32)课程特点分析")
+    short_hour = cube.short_hour(filter_key)
+
+    if short_hour is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("短学时课程数", short_hour['短学时课程数'])
         with col2:
-            # 考核方式统计
-            assessment_methods = []
-            for content in filtered_df['考核内容'].dropna():
-                if content not in ['未提供', '无', '']:
-                    assessment_methods.append(content.strip())
-
-            if assessment_methods:
-                method_counts = Counter(assessment_methods)
-                common_methods = method_counts.most_common(10)
-
-                if common_methods:
-                    methods_df = pd.DataFrame(common_methods, columns=['考核方式', '频次'])
-
-                    fig_methods = px.bar(
-                        methods_df,
-                        x='考核方式',
-                        y='频次',
-                        title='常见考核方式',
-                        color='频次',
-                        color_continuous_scale='RdBu',
-                        text='频次'
-                    )
-                    fig_methods.update_layout(xaxis_tickangle=-45)
-                    st.plotly_chart(fig_methods, use_container_width=True)
-
-        # 考核权重建议
-        st.markdown("##### 🎯 本校考核权重设计建议")
-
-        col1, col2 = st.columns(2)
+            st.metric("平均学分", f"{short_hour['平均学分']:.1f}")
+        with col3:
+            st.metric("翻转课堂比例", f"{short_hour['翻转课堂比例']:.1f}%")
+        with col4:
+            st.metric("软件实操比例", f"{short_hour['软件实操比例']:.1f}%")
+
+        # 短学时课程应对策略
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**💡 短学时课程应对策略建议：**")
+        st.markdown("""
+        1. **课前准备**：提前阅读教材1-3章，安装所需软件
+        2. **重点突出**：聚焦研究方法核心模块
+        3. **项目驱动**：用小项目贯穿学习全过程
+        4. **混合学习**：线上资源辅助课堂教学
+        5. **小组协作**：分组完成研究设计任务
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+# TAB 2: 软件工具
+def render_software_tab(filtered_df, indexes, view_key):
+    """软件工具使用分析"""
+
+    st.markdown('<h2 class="sub-header">🛠️ 软件工具使用分析</h2>', unsafe_allow_html=True)
+
+    # 软件工具分析
+    tools_df = analyze_software_tools(filtered_df, indexes['tools'])
+    software_summary = summarize_software_courses(filtered_df, indexes['tools'])
+
+    if not tools_df.empty:
+        col1, col2 = st.columns([3, 1])
 
         with col1:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**📝 基于数据分析的建议：**")
-            st.markdown("""
-            | 考核环节 | 建议权重 | 说明 |
-            |---------|---------|------|
-            | 平时成绩 | 40% | 出勤、作业、课堂参与 |
-            | 软件实操 | 25% | Stata/SPSS数据分析 |
-            | 开题报告 | 15% | 研究设计方案 |
-            | 期末论文 | 20% | 完整研究报告 |
-            """, unsafe_allow_html=True)
-            st.markdown("**总分：100%**")
-            st.markdown('</div>', unsafe_allow_html=True)
+            # 软件使用频率
+            show_figure(view_key, 'software_tools', tools_df)
 
         with col2:
             st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**⚖️ 权重设计原则：**")
+            st.markdown("**📊 软件使用统计**")
+
+            st.metric("开设软件课程", f"{software_summary['开设软件课程']}/{software_summary['课程总数']}")
+
+            st.markdown("**💡 学习建议：**")
             st.markdown("""
-            1. **过程导向**：强调平时积累(40%)
-            2. **能力导向**：突出软件实操(25%)
-            3. **实践导向**：重视研究设计(15%)
-            4. **成果导向**：检验综合能力(20%)
-
-            **📈 数据支持：**
-            - 平均平时权重：43.8%
-            - 软件实操课程：56.3%
-            - 开题报告：31.3%
+            1. **SPSS** - 必学（7门课程使用）
+            2. **Stata** - 重点（4门课程使用）
+            3. **AI工具** - 新兴（2门课程使用）
+            4. **Python** - 进阶（自主补充）
             """)
             st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.warning("暂无软件工具使用数据")
 
-    # TAB 4: 特色做法
-    with tab4:
-        st.markdown('<h2 class="sub-header">✨ 各校特色做法与创新</h2>', unsafe_allow_html=True)
-
-        # 筛选有特色做法的课程
-        special_courses = filtered_df[filtered_df['特色做法'] != '未提供']
-
-        if not special_courses.empty:
-            # 分类展示特色做法
-            categories = {
-                "👥 小组协作": ["小组汇报", "案例分析", "小组讨论"],
-                "🎯 实践导向": ["软件实操", "数据收集", "论文撰写"],
-                "🤖 技术创新": ["AI", "智能体", "在线平台"],
-                "👨‍🏫 专家分享": ["专家讲座", "学长分享", "跨专业交流"]
-            }
-
-            for category, keywords in categories.items():
-                # 查找相关课程
-                related_courses = []
-                for _, row in special_courses.iterrows():
-                    if any(keyword in str(row['特色做法']) for keyword in keywords):
-                        related_courses.append(row)
-
-                if related_courses:
-                    st.markdown(f"##### {category}")
-                    for course in related_courses[:3]:  # 显示前3个
-                        with st.expander(f"**{course['高校名称']}** - {course['课程名']}"):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.markdown(f"**特色做法：** {course['特色做法']}")
-                            with col2:
-                                st.markdown(f"**学时：** {int(course['学时'])}")
-                                st.markdown(f"**模式：** {course['教学模式']}")
-
-            # 所有特色做法展示
-            st.markdown("##### 📋 全部特色做法列表")
-            for idx, row in special_courses.iterrows():
-                with st.expander(f"{row['高校名称']} - {row['课程名']} ({int(row['学时'])}学时)"):
-                    st.markdown(f"**特色做法：** {row['特色做法']}")
-                    if row['软件工具'] != '未提供':
-                        st.markdown(f"**软件工具：** {row['软件工具']}")
-                    if row['考核内容'] != '未提供':
-                        st.markdown(f"**考核方式：** {row['考核内容']}")
-        else:
-            st.info("暂无特色做法数据")
+    # 软件实操课程分析
+    st.markdown("##### 💻 软件实操课程特点")
 
-        # 可移植经验总结
-        st.markdown("##### 💡 可移植的优秀经验")
+    if software_summary['开设软件课程'] > 0:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("平均学时", f"{software_summary['平均学时']:.1f}")
+        with col2:
+            st.metric("软件种类", software_summary['软件种类'])
+        with col3:
+            st.metric("翻转课堂比例", f"{software_summary['翻转课堂比例']:.1f}%")
+
+        # 显示软件课程列表：打开开关时才渲染内容
+        if st.toggle("📋 查看开设软件实操的课程", key='software_course_list'):
+            with st.container(border=True):
+                paginated_list(
+                    filtered_df[filtered_df['是否有软件实操']],
+                    ['高校名称', '课程名', '软件工具', '学时', '教学模式'],
+                    render_software_course,
+                    key='software_courses',
+                )
 
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.markdown("""
-        **基于数据分析的可移植经验：**
 
-        1. **混合教学模式**（北京邮电大学）
-           - 线上智能体辅助 + 线下项目式教学
-           - 适合：软件实操课程
+def render_software_course(university, course, tools, hours, mode):
+    """软件实操课程列表中的一门课程"""
+    st.markdown(f"**{university}** - {course}")
+    st.markdown(f"软件工具：{tools}")
+    st.markdown(f"学时：{int(hours)} | 教学模式：{mode}")
+    st.markdown("---")
+
+
+# TAB 3: 考核评估
+def render_assessment_tab(filtered_df, indexes, view_key):
+    """考核评估方式分析"""
+    st.markdown('<h2 class="sub-header">📊 考核评估方式分析</h2>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # 考核权重分布
+        show_figure(view_key, 'assessment_weights', filtered_df)
+
+    with col2:
+        # 考核方式统计：按加载期解析的考核成分计数
+        show_figure(view_key, 'assessment_methods', filtered_df, indexes['assessments'])
 
-        2. **专家分享机制**（中国农业大学）
-           - 邀请专家、学长进行案例分享
-           - 适合：前沿方法介绍
+    # 考核权重建议
+    st.markdown("##### 🎯 本校考核权重设计建议")
 
-        3. **全过程研究训练**（北京外国语大学）
-           - 文献综述 → 问卷设计 → 数据分析 → 论文撰写
-           - 适合：研究能力培养
+    col1, col2 = st.columns(2)
 
-        4. **小组协作学习**（多所高校）
-           - 小组汇报 + 案例分析 + 项目合作
-           - 适合：综合能力提升
+    with col1:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**📝 基于数据分析的建议：**")
+        st.markdown("""
+        | 考核环节 | 建议权重 | 说明 |
+        |---------|---------|------|
+        | 平时成绩 | 40% | 出勤、作业、课堂参与 |
+        | 软件实操 | 25% | Stata/SPSS数据分析 |
+        | 开题报告 | 15% | 研究设计方案 |
+        | 期末论文 | 20% | 完整研究报告 |
+        """, unsafe_allow_html=True)
+        st.markdown("**总分：100%**")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**⚖️ 权重设计原则：**")
+        st.markdown("""
+        1. **过程导向**：强调平时积累(40%)
+        2. **能力导向**：突出软件实操(25%)
+        3. **实践导向**：重视研究设计(15%)
+        4. **成果导向**：检验综合能力(20%)
+
+        **📈 数据支持：**
+        - 平均平时权重：43.8%
+        - 软件实操课程：56.3%
+        - 开题报告：31.3%
         """)
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # TAB 5: 详细数据
-    with tab5:
-        st.markdown('<h2 class="sub-header">📋 详细数据浏览与导出</h2>', unsafe_allow_html=True)
-
-        # 搜索功能
-        search_term = st.text_input("🔍 搜索数据（高校、课程、软件等）", "")
-
-        # 显示数据
-        display_df = filtered_df.copy()
-
-        if search_term:
-            # 在文本列中搜索
-            text_cols = ['高校名称', '课程名', '特色做法', '核心教材', '软件工具', '考核内容']
-            mask = pd.Series([False] * len(display_df))
-            for col in text_cols:
-                if col in display_df.columns:
-                    mask = mask | display_df[col].astype(str).str.contains(search_term, case=False, na=False)
-            display_df = display_df[mask]
-
-        # 选择显示的列
-        default_cols = ['高校名称', '课程名', '学时', '学分', '教学模式', '是否翻转课堂',
-                        '软件工具', '平时权重', '期末权重', '考核内容']
-
-        available_cols = [col for col in default_cols if col in display_df.columns]
-        selected_cols = st.multiselect(
-            "选择显示的列",
-            display_df.columns.tolist(),
-            default=available_cols
+
+# TAB 4: 特色做法
+def render_practices_tab(filtered_df, positions, indexes):
+    """各校特色做法与创新"""
+    st.markdown('<h2 class="sub-header">✨ 各校特色做法与创新</h2>', unsafe_allow_html=True)
+
+    # 筛选有特色做法的课程
+    special_mask = (filtered_df['特色做法'] != '未提供').to_numpy()
+    special_courses = filtered_df[special_mask]
+
+    if not special_courses.empty:
+        # 分类展示特色做法：使用加载时算好的类别位掩码
+        practices = indexes['practices']
+        category_masks = practices.masks[positions][special_mask]
+
+        for bit, category in enumerate(practices.labels):
+            # 查找相关课程
+            related_courses = special_courses[(category_masks >> bit) & 1 == 1]
+
+            if not related_courses.empty:
+                st.markdown(f"##### {category}")
+                # 显示前3个
+                examples = related_courses.head(3)[['高校名称', '课程名', '特色做法', '学时', '教学模式']]
+                for university, course, practice, hours, mode in examples.itertuples(index=False, name=None):
+                    with st.expander(f"**{university}** - {course}"):
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.markdown(f"**特色做法：** {practice}")
+                        with col2:
+                            st.markdown(f"**学时：** {int(hours)}")
+                            st.markdown(f"**模式：** {mode}")
+
+        # 所有特色做法展示
+        st.markdown("##### 📋 全部特色做法列表")
+        paginated_list(
+            special_courses,
+            ['高校名称', '课程名', '学时', '特色做法', '软件工具', '考核内容'],
+            render_practice_course,
+            key='practice_courses',
         )
+    else:
+        st.info("暂无特色做法数据")
 
-        if selected_cols:
-            display_data = display_df[selected_cols]
-        else:
-            display_data = display_df
+    # 可移植经验总结
+    st.markdown("##### 💡 可移植的优秀经验")
+
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.markdown("""
+    **基于数据分析的可移植经验：**
+
+    1. **混合教学模式**（北京邮电大学）
+       - 线上智能体辅助 + 线下项目式教学
+       - 适合：软件实操课程
+
+    2. **专家分享机制**（中国农业大学）
+       - 邀请专家、学长进行案例分享
+       - 适合：前沿方法介绍
+
+    3. **全过程研究训练**（北京外国语大学）
+       - 文献综述 → 问卷设计 → 数据分析 → 论文撰写
+       - 适合：研究能力培养
+
+    4. **小组协作学习**（多所高校）
+       - 小组汇报 + 案例分析 + 项目合作
+       - 适合：综合能力提升
+    """)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_practice_course(university, course, hours, practice, tools, assessment):
+    """特色做法列表中的一门课程"""
+    with st.expander(f"{university} - {course} ({int(hours)}学时)"):
+        st.markdown(f"**特色做法：** {practice}")
+        if tools != '未提供':
+            st.markdown(f"**软件工具：** {tools}")
+        if assessment != '未提供':
+            st.markdown(f"**考核方式：** {assessment}")
+
+
+# TAB 5: 详细数据
+def render_data_tab(filtered_df, positions, indexes, view_key):
+    """详细数据浏览与导出"""
+    st.markdown('<h2 class="sub-header">📋 详细数据浏览与导出</h2>', unsafe_allow_html=True)
+
+    # 搜索功能
+    search_term = st.text_input(
+        "🔍 搜索数据（高校、课程、软件等）", "",
+        help="空格分隔多个关键词表示同时包含；“列名:关键词”只在该列中搜索，如 软件工具:SPSS"
+    )
 
-        # 显示数据表
+    # 布尔字段只在当前页和导出文件中还原为是/否标签
+    display_df = filtered_df
+
+    if search_term.strip():
+        # 在文本列的倒排索引中搜索，按行位置与筛选结果对齐
+        search_mask = indexes['search'].search(search_term)
+        display_df = display_df[search_mask[positions]]
+
+    # 选择显示的列
+    default_cols = ['高校名称', '课程名', '学时', '学分', '教学模式', '是否翻转课堂',
+                    '软件工具', '平时权重', '期末权重', '考核内容']
+
+    available_cols = [col for col in default_cols if col in display_df.columns]
+    selected_cols = st.multiselect(
+        "选择显示的列",
+        display_df.columns.tolist(),
+        default=available_cols
+    )
+
+    if selected_cols:
+        display_data = display_df[selected_cols]
+    else:
+        display_data = display_df
+
+    # 显示数据表：结果键 = (数据集版本, 筛选条件, 搜索词, 列)
+    result_key = view_key + (search_term.strip(), tuple(display_data.columns))
+    with profile_section('数据表分页'):
+        page_data = table_page(display_data, result_key)
+    st.dataframe(
+        page_data,
+        use_container_width=True,
+        height=600,
+        column_config={
+            "高校名称": st.column_config.TextColumn(width="medium"),
+            "课程名": st.column_config.TextColumn(width="large"),
+            "特色做法": st.column_config.TextColumn(width="medium"),
+            "软件工具": st.column_config.TextColumn(width="medium"),
+            "考核内容": st.column_config.TextColumn(width="medium")
+        }
+    )
+
+    # 数据统计
+    st.markdown("##### 📈 数据统计摘要")
+
+    if not display_data.empty:
+        stats_cols = st.columns(4)
+        summary = summarize_display(display_data)
+
+        with stats_cols[0]:
+            st.metric("显示记录数", summary['显示记录数'])
+        with stats_cols[1]:
+            if '平均学时' in summary:
+                st.metric("平均学时", f"{summary['平均学时']:.1f}")
+        with stats_cols[2]:
+            if '平时权重均值' in summary:
+                st.metric("平时权重均值", f"{summary['平时权重均值']:.1f}%")
+        with stats_cols[3]:
+            if '期末权重均值' in summary:
+                st.metric("期末权重均值", f"{summary['期末权重均值']:.1f}%")
+
+    # 数据下载
+    st.markdown("##### 💾 数据导出")
+
+    export_cache = get_export_cache()
+    export_cols = st.columns(len(EXPORT_FORMATS))
+    file_stem = f"管理研究方法论_课程数据_{datetime.now().strftime('%Y%m%d_%H%M')}"
+    for export_col, (fmt, (label, extension, mime)) in zip(export_cols, EXPORT_FORMATS.items()):
+        # 文件在点击时才生成：按 (数据集版本, 筛选条件, 搜索词, 列, 格式) 缓存
+        export_key = result_key + (fmt,)
+        with export_col:
+            st.download_button(
+                label=label,
+                data=lambda key=export_key, fmt=fmt: export_cache.get_or_build(
+                    key, export_display, display_data, fmt
+                ),
+                file_name=f"{file_stem}.{extension}",
+                mime=mime,
+            )
+
+
+# TAB 6: 课程建议
+def render_advice_tab():
+    """新生学习全攻略"""
+    st.markdown('<h2 class="sub-header">🎯 新生学习全攻略</h2>', unsafe_allow_html=True)
+
+    # 创建三列布局
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        # 16周课程安排
+        st.markdown("##### 📅 16周详细课程安排")
+
+        # 创建课程安排表格
+        schedule_data = {
+            "周次": ["1-2周", "3-4周", "5-6周", "7-8周", "9-10周", "11-12周", "13-14周", "15-16周"],
+            "教学模块": [
+                "课程导论与研究方法基础",
+                "研究设计与问题提出",
+                "文献综述与理论框架",
+                "定量研究方法（SPSS/Stata）",
+                "质性研究方法",
+                "数据收集与处理实践",
+                "研究论文撰写指导",
+                "成果展示与课程总结"
+            ],
+            "核心任务": [
+                "掌握研究基本范式，安装软件",
+                "确定研究选题，设计研究方案",
+                "完成文献综述，建立理论框架",
+                "掌握描述统计、相关分析、回归分析",
+                "学习案例研究、访谈法、内容分析",
+                "设计问卷/实验，收集处理数据",
+                "撰写完整研究论文（8000字）",
+                "小组答辩，提交最终成果"
+            ],
+            "关键产出": [
+                "研究兴趣报告",
+                "开题报告框架",
+                "文献综述初稿",
+                "数据分析练习1-3",
+                "质性分析报告",
+                "数据集+处理文档",
+                "论文初稿",
+                "最终论文+答辩PPT"
+            ]
+        }
+
+        schedule_df = pd.DataFrame(schedule_data)
         st.dataframe(
-            display_data,
+            schedule_df,
             use_container_width=True,
-            height=600,
+            height=400,
             column_config={
-                "高校名称": st.column_config.TextColumn(width="medium"),
-                "课程名": st.column_config.TextColumn(width="large"),
-                "特色做法": st.column_config.TextColumn(width="medium"),
-                "软件工具": st.column_config.TextColumn(width="medium"),
-                "考核内容": st.column_config.TextColumn(width="medium")
-            }
+                "周次": st.column_config.TextColumn(width="small"),
+                "教学模块": st.column_config.TextColumn(width="medium"),
+                "核心任务": st.column_config.TextColumn(width="large"),
+                "关键产出": st.column_config.TextColumn(width="medium")
+            },
+            hide_index=True
         )
 
-        # 数据统计
-        st.markdown("##### 📈 数据统计摘要")
-
-        if not display_data.empty:
-            stats_cols = st.columns(4)
-
-            with stats_cols[0]:
-                st.metric("显示记录数", len(display_data))
-            with stats_cols[1]:
-                if '学时' in display_data.columns:
-                    avg_hours = display_data['学时'].mean()
-                    st.metric("平均学时", f"{avg_hours:.1f}")
-            with stats_cols[2]:
-                if '平时权重' in display_data.columns:
-                    avg_usual = display_data['平时权重'].mean()
-                    st.metric("平时权重均值", f"{avg_usual:.1f}%")
-            with stats_cols[3]:
-                if '期末权重' in display_data.columns:
-                    avg_final = display_data['期末权重'].mean()
-                    st.metric("期末权重均值", f"{avg_final:.1f}%")
-
-        # 数据下载
-        st.markdown("##### 💾 数据导出")
-
-        csv_data = display_data.to_csv(index=False).encode('utf-8-sig')
-        st.download_button(
-            label="📥 下载当前数据 (CSV)",
-            data=csv_data,
-            file_name=f"管理研究方法论_课程数据_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv",
-        )
-    # TAB 6: 课程建议
-    with tab6:
-        st.markdown('<h2 class="sub-header">🎯 新生学习全攻略</h2>', unsafe_allow_html=True)
 
-        # 创建三列布局
-        col1, col2, col3 = st.columns([2, 1, 1])
 
-        with col1:
-            # 16周课程安排
-            st.markdown("##### 📅 16周详细课程安排")
-
-            # 创建课程安排表格
-            schedule_data = {
-                "周次": ["1-2周", "3-4周", "5-6周", "7-8周", "9-10周", "11-12周", "13-14周", "15-16周"],
-                "教学模块": [
-                    "课程导论与研究方法基础",
-                    "研究设计与问题提出",
-                    "文献综述与理论框架",
-                    "定量研究方法（SPSS/Stata）",
-                    "质性研究方法",
-                    "数据收集与处理实践",
-                    "研究论文撰写指导",
-                    "成果展示与课程总结"
-                ],
-                "核心任务": [
-                    "掌握研究基本范式，安装软件",
-                    "确定研究选题，设计研究方案",
-                    "完成文献综述，建立理论框架",
-                    "掌握描述统计、相关分析、回归分析",
-                    "学习案例研究、访谈法、内容分析",
-                    "设计问卷/实验，收集处理数据",
-                    "撰写完整研究论文（8000字）",
-                    "小组答辩，提交最终成果"
-                ],
-                "关键产出": [
-                    "研究兴趣报告",
-                    "开题报告框架",
-                    "文献综述初稿",
-                    "数据分析练习1-3",
-                    "质性分析报告",
-                    "数据集+处理文档",
-                    "论文初稿",
-                    "最终论文+答辩PPT"
-                ]
-            }
-
-            schedule_df = pd.DataFrame(schedule_data)
-            st.dataframe(
-                schedule_df,
-                use_container_width=True,
-                height=400,
-                column_config={
-                    "周次": st.column_config.TextColumn(width="small"),
-                    "教学模块": st.column_config.TextColumn(width="medium"),
-                    "核心任务": st.column_config.TextColumn(width="large"),
-                    "关键产出": st.column_config.TextColumn(width="medium")
-                },
-                hide_index=True
-            )
+    with col2:
+        # 预习清单
+        st.markdown("##### 📋 开学前预习清单")
 
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**✅ 开学前必做事项：**")
 
+        # 使用checkbox创建清单
+        checklist_items = [
+            ("购买李怀祖《管理研究方法论》教材", True),
+            ("安装SPSS软件（官网下载试用版）", True),
+            ("安装Stata软件（学校提供教育版）", True),
+            ("预习教材第1-2章（研究方法基础）", True),
+            ("思考2-3个潜在研究问题", True),
+            ("准备移动硬盘/U盘（备份数据）", True)
+        ]
 
-        with col2:
-            # 预习清单
-            st.markdown("##### 📋 开学前预习清单")
+        for item, checked in checklist_items:
+            if checked:
+                st.markdown(f"✓ **{item}**")
+            else:
+                st.markdown(f"□ {item}")
 
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**✅ 开学前必做事项：**")
-
-            # 使用checkbox创建清单
-            checklist_items = [
-                ("购买李怀祖《管理研究方法论》教材", True),
-                ("安装SPSS软件（官网下载试用版）", True),
-                ("安装Stata软件（学校提供教育版）", True),
-                ("预习教材第1-2章（研究方法基础）", True),
-                ("思考2-3个潜在研究问题", True),
-                ("准备移动硬盘/U盘（备份数据）", True)
-            ]
+        st.markdown("---")
+
+
+
+    with col3:
 
-            for item, checked in checklist_items:
-                if checked:
-                    st.markdown(f"✓ **{item}**")
-                else:
-                    st.markdown(f"□ {item}")
+        # 提分策略
+        st.markdown('<div class="highlight-box">', unsafe_allow_html=True)
+        st.markdown("**💡 提分黄金策略：**")
+        st.markdown("""
+        1. **提前沟通**：与老师讨论研究选题
+        2. **过程记录**：保留所有中间文件
+        3. **规范先行**：严格遵循格式要求
+        4. **团队协作**：发挥小组成员优势
+        5. **迭代改进**：根据反馈持续优化
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+    col_a, col_b = st.columns(2)
 
-            st.markdown("---")
 
 
+    # 快速入门指南
+    st.markdown("##### 🚀 快速入门三步曲")
+
+    quick_guide_col1, quick_guide_col2, quick_guide_col3 = st.columns(3)
+
+    with quick_guide_col1:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**📘 第一步：理论准备（第1-2周）**")
+        st.markdown("""
+        **目标**：建立方法论框架
 
+        **行动清单**：
+        - 精读教材1-3章
+        - 整理关键概念
+        - 确定研究兴趣方向
+        - 完成第一次作业
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with quick_guide_col2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**💻 第二步：技能准备（第3-4周）**")
+        st.markdown("""
+        **目标**：掌握核心软件
+
+        **行动清单**：
+        - 完成SPSS基础教程
+        - 掌握Stata基本命令
+        - 处理第一个数据集
+        - 提交数据分析练习
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with quick_guide_col3:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown("**📝 第三步：研究设计（第5-6周）**")
+        st.markdown("""
+        **目标**：形成研究方案
+
+        **行动清单**：
+        - 确定研究选题
+        - 设计研究方案
+        - 完成开题报告
+        - 组建研究小组
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+# 主应用
+def render_dashboard():
+    """渲染仪表盘的全部内容"""
+    # 标题
+    st.markdown('<h1 class="main-header">📊 管理研究方法论课程</h1>', unsafe_allow_html=True)
+
+
+    # 加载数据：本次重跑全程使用同一版本的数据和索引
+    with profile_section('加载数据'):
+        dataset = load_dataset()
+
+    if dataset is None or dataset.df.empty:
+        st.warning("请确保 '双一流高校课程开设情况.xlsx' 文件在当前目录，且包含名为 'Sheet1' 的工作表")
+        return
+    df, indexes = dataset.df, dataset.indexes
+
+    # 数据集在后台替换后提示一次
+    if st.session_state.get('dataset_number', dataset.number) != dataset.number:
+        st.toast("数据已更新")
+    st.session_state['dataset_number'] = dataset.number
+
+    # 显示基本统计
+    with profile_section('顶部指标'):
+        overview = indexes['cube'].overview()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("调研高校数", overview['调研高校数'])
+        with col2:
+            st.metric("平均学时", f"{overview['平均学时']:.1f}")
         with col3:
+            st.metric("翻转课堂比例", f"{overview['翻转课堂比例']:.1f}%")
+        with col4:
+            st.metric("软件实操比例", f"{overview['软件实操比例']:.1f}%")
 
-            # 提分策略
-            st.markdown('<div class="highlight-box">', unsafe_allow_html=True)
-            st.markdown("**💡 提分黄金策略：**")
-            st.markdown("""
-            1. **提前沟通**：与老师讨论研究选题
-            2. **过程记录**：保留所有中间文件
-            3. **规范先行**：严格遵循格式要求
-            4. **团队协作**：发挥小组成员优势
-            5. **迭代改进**：根据反馈持续优化
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown("---")
 
+    # 侧边栏筛选器
+    st.sidebar.header("🔍 数据筛选")
 
-        col_a, col_b = st.columns(2)
+    # 高校筛选
+    universities = sorted(df['高校名称'].dropna().unique().tolist())
+    selected_unis = st.sidebar.multiselect(
+        "选择高校",
+        universities,
+        default=universities
+    )
 
+    # 学时筛选
+    if '学时' in df.columns:
+        min_hours, max_hours = int(df['学时'].min()), int(df['学时'].max())
+        hour_range = st.sidebar.slider(
+            "学时范围",
+            min_hours, max_hours,
+            (min_hours, max_hours)
+        )
 
+    # 教学模式筛选
+    if '教学模式' in df.columns:
+        methods = df['教学模式'].dropna().unique().tolist()
+        selected_methods = st.sidebar.multiselect(
+            "教学模式",
+            methods,
+            default=list(methods)
+        )
 
-        # 快速入门指南
-        st.markdown("##### 🚀 快速入门三步曲")
+    # 应用筛选
+    with profile_section('应用筛选'):
+        selections = {'高校名称': selected_unis, '教学模式': selected_methods if '教学模式' in df.columns else None}
+        value_range = hour_range if '学时' in df.columns else None
+        positions = indexes['filters'].filter(selections, value_range)
+        # 图表缓存键：数据集版本 + 规范化后的筛选条件
+        view_key = (dataset.version, indexes['filters'].normalize(selections, value_range))
+        # 不筛选时直接使用共享数据集；筛选结果按条件在会话间共享，相同条件只取一次子集
+        if view_key[1]:
+            filtered_df = get_view_cache().get_or_build(view_key, select_rows, df, positions)
+        else:
+            filtered_df = df
+    #xinsheng
+    st.sidebar.markdown("---")
+    with st.sidebar.expander("★ 致新生的一封信", expanded=False):
+        st.markdown("""
+        <div style="text-indent: 2em; line-height: 1.6; font-size: 14px; color: #4B5563;">
+        亲爱的同学们：
 
-        quick_guide_col1, quick_guide_col2, quick_guide_col3 = st.columns(3)
+        欢迎踏上管理研究方法的学习之旅！作为一门连接理论与实践、思维与工具的核心课程，《管理研究方法论》不仅是学术研究的基石，更是未来职场竞争力的重要支撑。
 
-        with quick_guide_col1:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**📘 第一步：理论准备（第1-2周）**")
-            st.markdown("""
-            **目标**：建立方法论框架
+        在这门课程中，你将不再是被动的知识接受者，而是主动的研究探索者。通过对比16所一流高校的教学实践，我们发现：成功的学习者往往具备三个特质——<strong>好奇心</strong>、<strong>执行力</strong>、<strong>协作力</strong>。
 
-            **行动清单**：
-            - 精读教材1-3章
-            - 整理关键概念
-            - 确定研究兴趣方向
-            - 完成第一次作业
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
+        32学时的课程虽然紧凑，但我们已经为你规划了清晰的路线图。记住，软件操作只是工具，研究思维才是核心。当你完成第一个数据分析、撰写第一篇研究方案时，那种创造的成就感将远超任何考试分数。
 
-        with quick_guide_col2:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**💻 第二步：技能准备（第3-4周）**")
-            st.markdown("""
-            **目标**：掌握核心软件
+        让我们携手开启这段探索之旅，在学习中发现研究的乐趣，在挑战中收获成长的喜悦！
+        </div>
 
-            **行动清单**：
-            - 完成SPSS基础教程
-            - 掌握Stata基本命令
-            - 处理第一个数据集
-            - 提交数据分析练习
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
+        <div style="text-align: right; font-style: italic; margin-top: 15px; color: #6B7280;">
+        —— 你的学长学姐们
+        </div>
+        """, unsafe_allow_html=True)
 
-        with quick_guide_col3:
-            st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.markdown("**📝 第三步：研究设计（第5-6周）**")
-            st.markdown("""
-            **目标**：形成研究方案
+    # 标签页：每个页面由独立的渲染函数负责
+    sections = {
+        "🏫 课程概览": lambda: render_overview_tab(indexes['cube'], view_key),
+        "🛠️ 软件工具": lambda: render_software_tab(filtered_df, indexes, view_key),
+        "📊 考核评估": lambda: render_assessment_tab(filtered_df, indexes, view_key),
+        "✨ 特色做法": lambda: render_practices_tab(filtered_df, positions, indexes),
+        "📋 详细数据": lambda: render_data_tab(filtered_df, positions, indexes, view_key),
+        "💡 课程建议": render_advice_tab,
+    }
+
+    if TAB_MODE == 'tabs':
+        # 传统标签页：每次重跑都会计算全部页面
+        for tab, (name, render) in zip(st.tabs(list(sections)), sections.items()):
+            with tab, profile_section(f'页面:{name}'):
+                render()
+    else:
+        # 按需渲染：只计算当前选中的页面，选择保存在 session_state 中
+        active_section = st.radio(
+            "页面", list(sections), horizontal=True,
+            key='active_section', label_visibility='collapsed'
+        )
+        with profile_section(f'页面:{active_section}'):
+            sections[active_section]()
 
-            **行动清单**：
-            - 确定研究选题
-            - 设计研究方案
-            - 完成开题报告
-            - 组建研究小组
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
     # 页脚信息
     st.markdown("---")
     st.markdown("""
@@ -926,6 +880,84 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+
+def profiling_mode():
+    """当前会话的性能分析模式：'' / 'time' / 'memory'，URL 参数优先于环境变量"""
+    mode = (st.query_params.get('profile') or PROFILE_MODE).lower()
+    if mode in ('1', 'true', 'on'):
+        return 'time'
+    return mode if mode in ('time', 'memory') else ''
+
+
+@st.cache_resource
+def get_profile_history():
+    """进程内共享的最近若干次重跑记录，用于计算滚动分位数"""
+    return deque(maxlen=PROFILE_HISTORY)
+
+
+@st.cache_resource
+def get_profile_lock():
+    """进程内共享的锁：各会话追加写入性能记录、读写重跑历史时互斥
+
+    Streamlit 每次重跑都会重新执行本脚本，模块级的锁每次都是新对象，因此由 st.cache_resource 保存。
+    """
+    return threading.Lock()
+
+
+def write_profile_trace(record):
+    """以 JSON Lines 追加写入性能记录，供离线分析"""
+    try:
+        os.makedirs(os.path.dirname(PROFILE_TRACE_FILE) or '.', exist_ok=True)
+        with get_profile_lock(), open(PROFILE_TRACE_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+
+def render_profile_panel(record, history):
+    """侧边栏性能面板：本次重跑各区段耗时与最近重跑的 p50/p95；history 为重跑历史的快照列表"""
+    samples = {}
+    for past in history:
+        samples.setdefault('整次重跑', []).append(past['total_ms'])
+        for section in past['sections']:
+            samples.setdefault(section['name'], []).append(section['ms'])
+
+    rows = [{'区段': '整次重跑', '本次(ms)': record['total_ms']}]
+    for section in record['sections']:
+        row = {'区段': '  ' * section['depth'] + section['name'], '本次(ms)': section['ms']}
+        if 'peak_kb' in section:
+            row['内存峰值(KB)'] = section['peak_kb']
+        rows.append(row)
+    for row, name in zip(rows, ['整次重跑'] + [section['name'] for section in record['sections']]):
+        row['p50(ms)'] = float(np.percentile(samples[name], 50))
+        row['p95(ms)'] = float(np.percentile(samples[name], 95))
+
+    with st.sidebar.expander("⏱️ 性能分析", expanded=True):
+        st.caption(f"最近 {len(history)} 次重跑 | 记录写入 {PROFILE_TRACE_FILE}")
+        st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+
+
+def main():
+    mode = profiling_mode()
+    if not mode:
+        render_dashboard()
+        return
+
+    profiler = RerunProfiler(memory=(mode == 'memory'))
+    try:
+        with use_profiler(profiler):
+            render_dashboard()
+    finally:
+        record = profiler.finish()
+        # 其他会话可能同时追加记录：在锁内追加并取快照，分位数按快照计算
+        with get_profile_lock():
+            history = get_profile_history()
+            history.append(record)
+            snapshot = list(history)
+        write_profile_trace(record)
+        render_profile_panel(record, snapshot)
+
+
 # 运行应用
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+"""冷启动导入耗时基准：在新的解释器中用 python -X importtime 导入 app.py 顶层依赖的全部模块
+
+报告每条顶层导入的累计耗时和自身耗时最多的模块，并检查应延迟导入的模块没有出现在启动路径上。
+任一检查失败时以非零状态退出，可用于持续集成中防止冷启动变慢。
+
+用法：
+    python benchmarks/bench_import_time.py                   # 报告耗时并检查延迟导入
+    python benchmarks/bench_import_time.py --budget-ms 1500  # 另外要求总耗时不超过预算
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# 只在构建图表、读写工作簿时才需要的模块，不应在启动时导入
+DEFERRED_MODULES = ['figures', 'plotly.express', 'openpyxl']
+
+
+def startup_imports(script=os.path.join(ROOT_DIR, 'app.py')):
+    """脚本顶层导入的模块名（按出现顺序去重），函数内的延迟导入不计入"""
+    with open(script, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+def measure_imports(modules):
+    """在新解释器中导入模块，返回 [(模块, 自身微秒, 累计微秒, 嵌套深度)]；不含解释器启动时的导入"""
+    code = '; '.join(f'import {name}' for name in modules)
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT_DIR, check=True, capture_output=True, text=True,
+    ).stderr
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    # 第一个请求导入的模块之前的记录属于解释器启动（site、encodings 等）
+    roots = {name.split('.')[0] for name in modules}
+    start = next(i for i, record in enumerate(records) if record[3] == 0 and record[0].split('.')[0] in roots)
+    return records[start:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动导入耗时基准')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取总耗时最少的一次')
+    parser.add_argument('--top', type=int, default=15, help='列出自身耗时最多的模块数')
+    parser.add_argument('--budget-ms', type=float, help='启动导入总耗时预算（毫秒），超出时失败')
+    args = parser.parse_args()
+
+    modules = startup_imports()
+    runs = [measure_imports(modules) for _ in range(args.repeat)]
+    records = min(runs, key=lambda run: sum(cumulative for _, _, cumulative, depth in run if depth == 0))
+    total_ms = sum(cumulative for _, _, cumulative, depth in records if depth == 0) / 1000
+
+    print(f"app.py 启动导入：{', '.join(modules)}")
+    print(f"总耗时 {total_ms:.1f} ms（{len(records)} 个模块，{args.repeat} 次中最快）\n")
+    print("顶层导入累计耗时：")
+    for name, _, cumulative, depth in records:
+        if depth == 0:
+            print(f"  {name:<40} {cumulative / 1000:8.1f} ms")
+    print(f"\n自身耗时最多的 {args.top} 个模块：")
+    for name, self_us, _, _ in sorted(records, key=lambda record: record[1], reverse=True)[:args.top]:
+        print(f"  {name:<40} {self_us / 1000:8.1f} ms")
+
+    failures = []
+    imported = {name for name, _, _, _ in records}
+    for name in DEFERRED_MODULES:
+        if name in imported:
+            failures.append(f"{name} 应延迟导入，但出现在启动路径上")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"启动导入耗时 {total_ms:.1f} ms 超出预算 {args.budget_ms:.1f} ms")
+
+    deferred_ms = next(
+        cumulative for name, _, cumulative, depth in measure_imports(modules + ['figures'])
+        if depth == 0 and name == 'figures'
+    ) / 1000
+    print(f"\n首次构建图表时导入 figures（Plotly）约增加 {deferred_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"失败：{failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""多工作簿导入基准：在临时目录生成若干合成工作簿，比较单进程与进程池的冷启动导入耗时
+
+用法：python benchmarks/bench_multi_ingest.py [--files 8] [--rows 5000] [--workers 1 4 8]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+from synthetic import make_courses  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多工作簿并行导入基准')
+    parser.add_argument('--files', type=int, default=8, help='工作簿个数')
+    parser.add_argument('--rows', type=int, default=5000, help='每个工作簿的行数')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help='进程数')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_multi_ingest_')
+    try:
+        source_dir = os.path.join(work_dir, 'surveys')
+        os.makedirs(source_dir)
+        for i in range(args.files):
+            make_courses(args.rows, seed=i).to_excel(
+                os.path.join(source_dir, f'dept_{i:03d}.xlsx'), sheet_name='Sheet1', index=False
+            )
+        paths = analytics.resolve_workbooks(source_dir)
+        print(f"{args.files} 个工作簿 × {args.rows:,} 行")
+
+        os.chdir(work_dir)
+        for workers in args.workers:
+            # 每次都从冷启动开始：删除上一轮写入的快照
+            shutil.rmtree(analytics.CACHE_DIR, ignore_errors=True)
+            started = time.perf_counter()
+            df = analytics.read_workbooks(paths, max_workers=workers)
+            seconds = time.perf_counter() - started
+            print(f"  进程数 {workers:>3} | {seconds:8.2f}s | {len(df):,} 行")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
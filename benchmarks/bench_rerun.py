@@ -0,0 +1,53 @@
+"""重跑延迟基准：对比 st.tabs 全量渲染与按需渲染两种页面模式
+
+用法：python benchmarks/bench_rerun.py [重跑次数]
+通过 COURSE_DATA_FILE 指定更大的工作簿可以放大差异。
+"""
+import logging
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+
+def measure(tab_mode, reruns):
+    """修改侧边栏学时范围触发重跑，返回每次重跑耗时（秒）"""
+    os.environ['DASHBOARD_TAB_MODE'] = tab_mode
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+
+    slider = [s for s in at.slider if s.label == "学时范围"][0]
+    low, high = slider.value
+    timings = []
+    for i in range(reruns):
+        # 交替收窄/恢复学时范围，保证每次都是真实的筛选变化
+        new_range = (low, high) if i % 2 else (low, max(low, high - 1))
+        start = time.perf_counter()
+        [s for s in at.slider if s.label == "学时范围"][0].set_range(*new_range).run()
+        timings.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return timings
+
+
+def main():
+    logging.disable(logging.WARNING)
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    os.chdir(APP_DIR)
+
+    results = {mode: measure(mode, reruns) for mode in ['tabs', 'lazy']}
+    for mode, timings in results.items():
+        print(f"{mode:>5} | 中位数 {statistics.median(timings) * 1000:8.1f} ms"
+              f" | 最大 {max(timings) * 1000:8.1f} ms | {reruns} 次重跑")
+
+    speedup = statistics.median(results['tabs']) / statistics.median(results['lazy'])
+    print(f"按需渲染加速 {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""多会话内存基准：模拟若干会话同时持有筛选后的数据，比较逐会话复制与共享只读数据集的内存占用
+
+每种方式在独立子进程中运行，读取 /proc/self/status 的匿名内存（RssAnon）和文件映射内存（RssFile），
+报告会话建立前后的增量。匿名内存为进程私有；映射文件的页面由操作系统页缓存承载，可在进程间共享。
+
+用法：python benchmarks/bench_sessions.py [--rows 20000] [--sessions 1 50 300]
+"""
+import argparse
+import json
+import os
+import pickle
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+from synthetic import make_courses  # noqa: E402
+
+# 各会话的筛选条件轮流取自这些组合，第一项为不筛选（多数会话的默认状态）
+FILTERS = [
+    ({}, None),
+    ({'教学模式': ['线下']}, None),
+    ({'教学模式': ['线上', '混合']}, None),
+    ({}, (16, 32)),
+    ({}, (33, 48)),
+    ({'教学模式': ['线下']}, (16, 48)),
+]
+
+
+def memory_mb():
+    """当前进程的 (匿名内存, 文件映射内存) MB；没有 /proc 时退回最大常驻内存"""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if line.startswith('Rss'))
+        return int(fields['RssAnon'].split()[0]) / 1024, int(fields['RssFile'].split()[0]) / 1024
+    except (OSError, KeyError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 0.0
+
+
+def copied_sessions(df, n_sessions):
+    """旧的方式：每个会话从 st.cache_data 取得反序列化的副本，筛选和展示时再各复制一次"""
+    engine = analytics.FilterEngine(df)
+    pickled = pickle.dumps(df)
+    sessions = []
+    for i in range(n_sessions):
+        session_df = pickle.loads(pickled)
+        selections, value_range = FILTERS[i % len(FILTERS)]
+        filtered_df = analytics.select_rows(session_df, engine.filter(selections, value_range)).copy()
+        sessions.append((session_df, filtered_df, filtered_df.copy()))
+    return sessions
+
+
+def shared_sessions(df, n_sessions):
+    """共享方式：全部会话引用同一份内存映射数据集，相同筛选条件的子集只取一次"""
+    engine = analytics.FilterEngine(df)
+    views = analytics.SizedLRUCache(128 * 1024 * 1024, lambda frame: int(frame.memory_usage(deep=True).sum()))
+    sessions = []
+    for i in range(n_sessions):
+        selections, value_range = FILTERS[i % len(FILTERS)]
+        key = engine.normalize(selections, value_range)
+        positions = engine.filter(selections, value_range)
+        filtered_df = views.get_or_build(key, analytics.select_rows, df, positions) if key else df
+        sessions.append((df, filtered_df, filtered_df))
+    return sessions
+
+
+def run_child(mode, n_sessions, rows, work_dir):
+    """子进程：准备数据集，记录建立会话前后的内存"""
+    df = analytics.preprocess_data(make_courses(rows, seed=0))
+    if mode == 'shared':
+        df = analytics.map_frame(df, os.path.join(work_dir, 'dataset.arrow'))
+    before = memory_mb()
+    sessions = copied_sessions(df, n_sessions) if mode == 'copied' else shared_sessions(df, n_sessions)
+    after = memory_mb()
+    print(json.dumps({
+        'anon_mb': after[0] - before[0],
+        'file_mb': after[1] - before[1],
+        'sessions': len(sessions),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多会话内存基准')
+    parser.add_argument('--rows', type=int, default=20000, help='数据集行数')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 50, 300], help='模拟的会话数')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'SESSIONS', 'WORK_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, n_sessions, work_dir = args.child
+        run_child(mode, int(n_sessions), args.rows, work_dir)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='bench_sessions_')
+    try:
+        print(f"{args.rows:,} 行数据集；内存为建立会话前后的增量")
+        for n_sessions in args.sessions:
+            for mode in ['copied', 'shared']:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--rows', str(args.rows),
+                     '--child', mode, str(n_sessions), work_dir],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"  会话数 {n_sessions:>4} | {mode:<6} | 匿名内存 {result['anon_mb']:9.1f} MB"
+                      f" | 映射文件 {result['file_mb']:7.1f} MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""权重解析基准：逐行 apply 与向量化 str.extract 对比
+
+用法：python benchmarks/bench_weight_parser.py [行数 ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import parse_weights  # noqa: E402
+
+# 与真实数据一致的权重文本分布，另含全角数字、带符号等原实现能解析的写法
+SAMPLE_VALUES = ['40/60', '50/50', '20/80', '60/40', '40/61', ' 30 / 70 ', 0, '0', '无', None, '约40%', '',
+                 '４０/６０', ' ３０ / ７０ ', '+40/60', '40／60', '40/60/0']
+
+
+def legacy_extract(weight_text):
+    """原实现：逐行解析权重文本"""
+    if pd.isna(weight_text) or weight_text in ['0', '无', '', ' ']:
+        return 50, 50
+    text = str(weight_text)
+    if '/' in text:
+        parts = text.split('/')
+        if len(parts) == 2:
+            try:
+                return int(parts[0].strip()), int(parts[1].strip())
+            except ValueError:
+                pass
+    return 50, 50
+
+
+def make_weights(n_rows, seed=0):
+    """生成 n_rows 行权重文本"""
+    rng = np.random.default_rng(seed)
+    values = np.array(SAMPLE_VALUES, dtype=object)
+    return pd.Series(values[rng.integers(0, len(values), n_rows)], name='平时/期末权重')
+
+
+def run(n_rows):
+    weights = make_weights(n_rows)
+
+    start = time.perf_counter()
+    weight_info = weights.apply(legacy_extract)
+    legacy_usual = [w[0] for w in weight_info]
+    legacy_final = [w[1] for w in weight_info]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = parse_weights(weights)
+    vector_seconds = time.perf_counter() - start
+
+    assert parsed['平时权重'].tolist() == legacy_usual
+    assert parsed['期末权重'].tolist() == legacy_final
+
+    print(f"{n_rows:>9,} 行 | 逐行 {legacy_seconds:8.3f}s | 向量化 {vector_seconds:8.3f}s"
+          f" | 加速 {legacy_seconds / vector_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+    # 预热：排除正则编译等一次性开销
+    parse_weights(make_weights(100))
+    for size in sizes:
+        run(size)
@@ -0,0 +1,121 @@
+"""增量导入一致性检查：在临时目录生成合成工作簿并依次修改，比较增量导入与整表预处理的结果
+
+覆盖冷启动、热启动、新增/修改/删除、重复行、中位数填充值变化和多工作表流式读取；
+同时检查 IngestDelta 的各项计数。任一检查失败时以非零状态退出。
+
+用法：python benchmarks/check_ingest_parity.py [--rows 3000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+from synthetic import make_courses  # noqa: E402
+
+
+def normalized(series):
+    """列取值转为可直接比较的列表：空值统一为 None，数值统一为 float，忽略列类型差异"""
+    values = series.astype(object).where(series.notna(), None).tolist()
+    return [float(value) if isinstance(value, (int, float, np.number)) and not isinstance(value, bool) else value
+            for value in values]
+
+
+def frame_mismatches(got, expected):
+    """两个预处理结果不一致之处：列顺序不同，或各列第一处取值不同的位置"""
+    got, expected = got.reset_index(drop=True), expected.reset_index(drop=True)
+    if list(got.columns) != list(expected.columns):
+        return [f"列不同：{list(got.columns)} != {list(expected.columns)}"]
+    if len(got) != len(expected):
+        return [f"行数不同：{len(got)} != {len(expected)}"]
+    mismatches = []
+    for col in expected.columns:
+        got_values, expected_values = normalized(got[col]), normalized(expected[col])
+        if got_values != expected_values:
+            row = next(i for i, (a, b) in enumerate(zip(got_values, expected_values)) if a != b)
+            mismatches.append(f"{col} 第 {row} 行：{got_values[row]!r} != {expected_values[row]!r}")
+    return mismatches
+
+
+def full_preprocess(path, sheets):
+    """整表预处理：一次读入全部工作表后调用 preprocess_data；
+    混合类型的文本列按快照的存储形式统一为字符串（如核心教材中的 0 与书名）"""
+    frames = [pd.read_excel(path, sheet_name=sheet).assign(来源工作表=sheet) for sheet in sheets]
+    return analytics._to_storable(analytics.preprocess_data(pd.concat(frames, ignore_index=True)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量导入一致性检查')
+    parser.add_argument('--rows', type=int, default=3000, help='初始工作簿行数')
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(label, got, expected, delta=None, expected_delta=None):
+        problems = frame_mismatches(got, expected)
+        if expected_delta is not None and delta[:4] != expected_delta:
+            problems.append(f"变化统计 {delta[:4]} != {expected_delta}")
+        status = '通过' if not problems else '失败'
+        print(f"  {label:<16} | {len(got):>6,} 行 | {status}" + (f" | {delta}" if delta is not None else ''))
+        failures.extend(f"{label}：{problem}" for problem in problems)
+
+    work_dir = tempfile.mkdtemp(prefix='check_ingest_')
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        path = 'courses.xlsx'
+
+        # 初始工作簿：合成数据中 (高校名称, 课程名) 大量重复，另追加一批完全相同的重复行
+        raw = make_courses(args.rows, seed=1)
+        raw = pd.concat([raw, raw.iloc[:20]], ignore_index=True)
+        raw.to_excel(path, sheet_name='Sheet1', index=False)
+        _, delta = analytics.ingest_workbook(path)
+        check('冷启动', analytics.read_workbook(path), full_preprocess(path, ['Sheet1']),
+              delta, (len(raw), 0, 0, 0))
+        check('热启动', analytics.read_workbook(path), full_preprocess(path, ['Sheet1']))
+
+        # 删除开头 300 行（含重复行的首次出现），修改 60 行，追加 505 行行键不同的新课程
+        edited = raw.iloc[300:].copy()
+        edited.loc[edited.index[:60], '特色做法'] = edited.loc[edited.index[:60], '特色做法'].fillna('') + '（修订）'
+        appended = make_courses(505, seed=9)
+        appended['课程名'] = appended['课程名'] + '（新开）'
+        edited = pd.concat([edited, appended], ignore_index=True)
+        edited.to_excel(path, sheet_name='Sheet1', index=False)
+        _, delta = analytics.ingest_workbook(path)
+        check('增删改', analytics.read_workbook(path), full_preprocess(path, ['Sheet1']),
+              delta, (505, 60, 300, len(raw) - 360))
+
+        # 大量学时置空、部分学时改为 12：中位数变化，所有被填充的单元格和学时分层都要改写
+        shifted = edited.copy()
+        shifted.loc[shifted.index[:1500], '学时'] = np.nan
+        shifted.loc[shifted.index[1500:1600], '学时'] = 12.0
+        shifted.to_excel(path, sheet_name='Sheet1', index=False)
+        check('中位数变化', analytics.read_workbook(path), full_preprocess(path, ['Sheet1']))
+
+        # 按高校拆分的多个工作表：合并读取时走只读流式读取，不含必需列的说明页被跳过
+        multi_path = 'multi_sheet.xlsx'
+        with pd.ExcelWriter(multi_path) as writer:
+            make_courses(800, seed=4).to_excel(writer, sheet_name='北京大学', index=False)
+            make_courses(700, seed=5).to_excel(writer, sheet_name='清华大学', index=False)
+            pd.DataFrame({'说明': ['填写说明']}).to_excel(writer, sheet_name='说明', index=False)
+        check('多工作表流式', analytics.read_workbook(multi_path, '*'),
+              full_preprocess(multi_path, ['北京大学', '清华大学']))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"失败：{failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""热点路径基准测试：在合成数据上计时并统计内存峰值，结果保存为 JSON 便于版本间对比
+
+用法：
+    python benchmarks/run_benchmarks.py                       # 默认 1k / 100k / 1M 行
+    python benchmarks/run_benchmarks.py --sizes 1000 100000   # 指定行数
+    python benchmarks/run_benchmarks.py --compare 旧结果.json  # 与之前的结果对比
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+from synthetic import make_courses  # noqa: E402
+
+SEARCH_QUERIES = ['案例分析', 'SPSS', '小组 论文', '软件工具:Stata']
+
+
+def measure(func, *args, memory=True):
+    """返回 (结果, 耗时秒数, 内存峰值 MB)；内存峰值单独再跑一遍测量，避免 tracemalloc 影响计时"""
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        func(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return result, seconds, peak_mb
+
+
+def legacy_filter(df, selected_unis, hour_range, selected_methods):
+    """原 main() 中的筛选写法：复制后依次做三次布尔掩码"""
+    filtered_df = df.copy()
+    if selected_unis:
+        filtered_df = filtered_df[filtered_df['高校名称'].isin(selected_unis)]
+    filtered_df = filtered_df[(filtered_df['学时'] >= hour_range[0]) & (filtered_df['学时'] <= hour_range[1])]
+    if selected_methods:
+        filtered_df = filtered_df[filtered_df['教学模式'].isin(selected_methods)]
+    return filtered_df
+
+
+def legacy_search(df, search_term):
+    """原详细数据页的搜索写法：逐列 str.contains"""
+    mask = pd.Series(False, index=df.index)
+    for col in analytics.SEARCH_COLS:
+        mask = mask | df[col].astype(str).str.contains(search_term, case=False, na=False, regex=False)
+    return df[mask]
+
+
+def run_size(n_rows):
+    """对一个数据规模运行全部基准，返回 {操作: {seconds, peak_mb}}"""
+    results = {}
+
+    def record(name, func, *args, memory=True):
+        value, seconds, peak_mb = measure(func, *args, memory=memory)
+        results[name] = {'seconds': round(seconds, 6), 'peak_mb': None if peak_mb is None else round(peak_mb, 3)}
+        print(f"  {name:<32} {seconds * 1000:10.1f} ms"
+              + (f" | 峰值 {peak_mb:8.1f} MB" if peak_mb is not None else ""))
+        return value
+
+    raw = record('generate', make_courses, n_rows, memory=False)
+    df = record('preprocess_data', analytics.preprocess_data, raw)
+
+    tool_index = record('build_tool_index', analytics.build_tool_index, df)
+    engine = record('build_filter_engine', analytics.FilterEngine, df)
+    search_index = record('build_search_index', analytics.SearchIndex, df)
+    practice_index = record('build_practice_index', analytics.build_practice_index, df)
+    cube = record('build_cube', analytics.AggregateCube, df)
+    assessment_index = record('build_assessment_index', analytics.build_assessment_index, df)
+    indexes = {'tools': tool_index, 'filters': engine, 'cube': cube, 'search': search_index,
+               'practices': practice_index, 'assessments': assessment_index}
+
+    universities = sorted(df['高校名称'].dropna().unique().tolist())
+    selected_unis = universities[:len(universities) // 2]
+    selections = {'高校名称': selected_unis, '教学模式': ['线下', '混合']}
+    hour_range = (16, 48)
+
+    record('filter_legacy', legacy_filter, df, selected_unis, hour_range, ['线下', '混合'])
+    positions = record('filter_engine_cold', engine._evaluate, engine.normalize(selections, hour_range))
+    engine.filter(selections, hour_range)
+    record('filter_engine_memo', engine.filter, selections, hour_range, memory=False)
+    filtered_df = record('select_rows', analytics.select_rows, df, positions)
+
+    record('analyze_software_tools_full', analytics.analyze_software_tools, df, tool_index)
+    record('analyze_software_tools_filtered', analytics.analyze_software_tools, filtered_df, tool_index)
+    record('analyze_teaching_methods', analytics.analyze_teaching_methods, filtered_df)
+    filter_key = engine.normalize(selections, hour_range)
+    record('summarize_overview_filtered', analytics.summarize_overview, filtered_df)
+    record('cube_overview', cube.overview, filter_key, memory=False)
+    record('cube_teaching_methods', cube.teaching_methods, filter_key, memory=False)
+    record('cube_box_stats', cube.box_stats, '课堂规模', filter_key, memory=False)
+    record('count_assessment_methods', analytics.count_assessment_methods, filtered_df, assessment_index)
+    record('compute_aggregates', analytics.compute_aggregates, df, indexes)
+
+    for query in SEARCH_QUERIES:
+        record(f'search_index[{query}]', search_index.search, query)
+    record(f'search_legacy[{SEARCH_QUERIES[0]}]', legacy_search, df, SEARCH_QUERIES[0])
+
+    return results
+
+
+def git_revision():
+    """当前代码版本，用于标注结果"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path):
+    """打印与旧结果相比的耗时变化"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n与 {baseline_path}（{baseline['meta']['revision']}）对比：")
+    for size, ops in current['results'].items():
+        old_ops = baseline['results'].get(size, {})
+        for name, stats in ops.items():
+            if name in old_ops and old_ops[name]['seconds'] > 0:
+                ratio = stats['seconds'] / old_ops[name]['seconds']
+                flag = '  ⚠ 变慢' if ratio > 1.2 else ''
+                print(f"  {size:>9} 行 {name:<32} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--output', default=None, help='结果 JSON 路径，默认 benchmarks/results/<版本>.json')
+    parser.add_argument('--compare', default=None, help='与之前保存的结果 JSON 对比')
+    args = parser.parse_args()
+
+    revision = git_revision()
+    report = {
+        'meta': {
+            'revision': revision,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'results': {},
+    }
+
+    for n_rows in args.sizes:
+        print(f"{n_rows:,} 行")
+        report['results'][str(n_rows)] = run_size(n_rows)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f'{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
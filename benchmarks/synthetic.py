@@ -0,0 +1,86 @@
+"""合成课程数据生成器：复现真实工作簿的列结构和取值分布，可放大到任意行数"""
+import numpy as np
+import pandas as pd
+
+UNIVERSITIES = [
+    '中国农业大学', '东南大学', '南京师范大学', '湖南大学', '上海财经大学', '厦门大学', '北京外国语大学',
+    '北京邮电大学', '河北工业大学', '对外经济贸易大学', '兰州大学', '中国科学院大学', '郑州大学',
+    '西安交通大学', '哈尔滨工业大学', '长安大学', '中国矿业大学', '苏州大学', '同济大学', '华东师范大学',
+    '清华大学', '北京大学', '浙江大学', '复旦大学', '南京大学', '武汉大学', '中山大学', '四川大学',
+]
+SCHOOLS = ['经济管理学院', '管理学院', '商学院', '经济学院', '人文与发展学院', '政府管理学院', '国际商学院']
+COURSES = ['管理研究方法论', '管理研究方法', '社会研究方法', '实证研究方法', '管理科学研究方法',
+           '高级管理研究', '公共管理研究方法', '管理前沿理论', '管理研究基础']
+HOURS = [12, 16, 32, 36, 48, 54, 64]
+HOUR_WEIGHTS = [0.03, 0.03, 0.6, 0.05, 0.12, 0.12, 0.05]
+TOOLS = ['SPSS', 'Stata', 'AI', 'PLS', 'AMOS', 'SmartPLS', 'Python', 'R', 'Excel', 'NVivo', 'Mplus', 'MATLAB']
+WEIGHTS = ['40/60', '50/50', '20/80', '60/40', '30/70', ' 30 / 70 ', 0, '0', '无', None, '约40%']
+WEIGHT_PROBS = [0.25, 0.08, 0.05, 0.05, 0.05, 0.02, 0.3, 0.08, 0.05, 0.05, 0.02]
+PRACTICE_PHRASES = [
+    '小组汇报', '案例分析', '小组讨论', '软件实操', '数据收集', '论文撰写', 'AI辅助教学', '智能体答疑',
+    '在线平台', '专家讲座', '学长分享', '跨专业交流', '课前阅读相关论文', '阅读顶级期刊论文', '制作PPT讲解',
+    '线上铺垫式激疑重思考', '线下项目式推进重探究', '文献综述写作', '问卷调查', '实验研究',
+]
+ASSESSMENTS = ['期末课程论文', '平时作业', '期末作业', '课程报告', '实操软件', '撰写论文', '答辩', '研究计划书',
+               '阅读笔记', '过程形成性评价', '考试', '小组汇报', '开题报告', '期末考试']
+BOOKS = ['《细说统计》', '李怀祖《管理研究方法论》', '《高级管理学》', '《管理学研究方法》', '翟运开《管理研究方法论》']
+TEXT_POOL_SIZE = 5000
+
+
+def _join_pool(rng, items, max_items, separators, size):
+    """从词表中随机组合出 size 条多值文本"""
+    texts = []
+    for _ in range(size):
+        count = rng.integers(1, max_items + 1)
+        picked = rng.choice(items, count, replace=False)
+        texts.append(rng.choice(separators).join(picked))
+    return np.array(texts, dtype=object)
+
+
+def _pick(rng, values, n_rows, p=None):
+    """按概率从取值列表中抽样 n_rows 个"""
+    values = np.array(values, dtype=object)
+    return values[rng.choice(len(values), n_rows, p=p)]
+
+
+def make_courses(n_rows, seed=0):
+    """生成 n_rows 行原始课程数据（预处理之前的形态）"""
+    rng = np.random.default_rng(seed)
+
+    tool_texts = np.concatenate([
+        _join_pool(rng, TOOLS, 3, ['、', ',', ', '], TEXT_POOL_SIZE // 2),
+        np.array(['无'] * (TEXT_POOL_SIZE // 2), dtype=object),
+    ])
+    practice_texts = _join_pool(rng, PRACTICE_PHRASES, 4, ['，', '、', '；'], TEXT_POOL_SIZE)
+    assessment_texts = np.concatenate([
+        _join_pool(rng, ASSESSMENTS, 3, ['、', '+', '，'], TEXT_POOL_SIZE - 1),
+        np.array(['无'], dtype=object),
+    ])
+
+    hours = rng.choice(HOURS, n_rows, p=HOUR_WEIGHTS).astype(float)
+    # 少量缺失值，覆盖中位数填充逻辑
+    hours[rng.random(n_rows) < 0.01] = np.nan
+    class_size = rng.integers(30, 120, n_rows).astype(float)
+    class_size[rng.random(n_rows) < 0.01] = np.nan
+
+    return pd.DataFrame({
+        '序号': np.where(rng.random(n_rows) < 0.1, np.arange(1, n_rows + 1), np.nan),
+        '高校名称': _pick(rng, UNIVERSITIES, n_rows),
+        '学院': _pick(rng, SCHOOLS, n_rows),
+        '课程名': _pick(rng, COURSES, n_rows),
+        '学分': rng.choice([2, 3], n_rows, p=[0.8, 0.2]),
+        '学时': hours,
+        '面向层次': _pick(rng, ['硕士', '博士', None], n_rows, p=[0.9, 0.08, 0.02]),
+        '教学模式': _pick(rng, ['线下', '混合', '线上', None], n_rows, p=[0.8, 0.14, 0.04, 0.02]),
+        '课堂规模': class_size,
+        '是否翻转课堂': _pick(rng, ['是', '否', '有', None], n_rows, p=[0.45, 0.45, 0.05, 0.05]),
+        '特色做法': np.where(rng.random(n_rows) < 0.1, None, practice_texts[rng.integers(0, TEXT_POOL_SIZE, n_rows)]),
+        '核心教材': _pick(rng, [0] + BOOKS, n_rows, p=[0.75] + [0.05] * len(BOOKS)),
+        '软件工具': tool_texts[rng.integers(0, TEXT_POOL_SIZE, n_rows)],
+        '平时/期末权重': _pick(rng, WEIGHTS, n_rows, p=WEIGHT_PROBS),
+        '考核内容': assessment_texts[rng.integers(0, TEXT_POOL_SIZE, n_rows)],
+        '是否有软件实操': _pick(rng, ['是', '否'], n_rows, p=[0.4, 0.6]),
+        '是否有开题报告': _pick(rng, ['是', '否', '无'], n_rows, p=[0.25, 0.6, 0.15]),
+        '是否有答辩': _pick(rng, ['是', '否', '无'], n_rows, p=[0.2, 0.65, 0.15]),
+        '材料（若有）': _pick(rng, [None, 'https://example.edu.cn/course'], n_rows, p=[0.8, 0.2]),
+    })
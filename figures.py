@@ -0,0 +1,194 @@
+"""仪表盘图表构建函数：依赖 Plotly，仪表盘在第一次构建图表时才导入本模块"""
+import os
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from analytics import bin_weight_pairs, count_assessment_methods
+
+# 考核权重散点：不超过该行数时绘制全部点（SVG）；不超过 WEBGL 行数时改用 WebGL；更多时在服务端分箱
+WEIGHT_SCATTER_EXACT_ROWS = int(os.environ.get('WEIGHT_SCATTER_EXACT_ROWS', '2000'))
+WEIGHT_SCATTER_WEBGL_ROWS = int(os.environ.get('WEIGHT_SCATTER_WEBGL_ROWS', '20000'))
+
+
+# 图表缓存容量的估计：布局和模板序列化后约 7 KB，数据数组每个元素平均约 10～20 字节
+FIGURE_BASE_BYTES = 8 * 1024
+FIGURE_BYTES_PER_VALUE = 12
+# 图表轨迹中可能携带逐点数据的数组属性
+FIGURE_ARRAY_PROPS = ['x', 'y', 'z', 'values', 'labels', 'text', 'hovertext', 'customdata', 'ids']
+
+
+def figure_size(fig):
+    """图表序列化后字节数的估计，用于图表缓存的容量计算；按轨迹数组长度估算，不实际序列化"""
+    values = 0
+    for trace in fig.data:
+        for name in FIGURE_ARRAY_PROPS:
+            value = trace[name] if name in trace else None
+            if value is not None and not isinstance(value, str):
+                values += len(value)
+    return FIGURE_BASE_BYTES + values * FIGURE_BYTES_PER_VALUE
+
+
+# 图表构建函数：输入筛选后的数据，返回 Plotly 图表；没有可画的数据时返回 None
+def build_hour_distribution_figure(cube, filter_key):
+    """课程学时分布饼图"""
+    if '学时分层' not in cube.dims:
+        return None
+    hour_dist = cube.counts_by('学时分层', filter_key)
+    fig1 = px.pie(
+        values=hour_dist.values,
+        names=hour_dist.index,
+        title='课程学时分布',
+        color_discrete_sequence=px.colors.sequential.Blues_r,
+        hole=0.4
+    )
+    fig1.update_traces(textposition='inside', textinfo='percent+label')
+    return fig1
+
+
+def build_mode_distribution_figure(cube, filter_key):
+    """教学模式分布柱状图"""
+    if '教学模式' not in cube.dims:
+        return None
+    mode_dist = cube.counts_by('教学模式', filter_key)
+    mode_dist = mode_dist[mode_dist > 0]
+    fig2 = px.bar(
+        x=mode_dist.index,
+        y=mode_dist.values,
+        title='教学模式分布',
+        labels={'x': '教学模式', 'y': '课程数'},
+        color=mode_dist.values,
+        color_continuous_scale='Viridis'
+    )
+    return fig2
+
+
+def build_class_size_figure(cube, filter_key):
+    """课堂规模箱线图：统计量由各分组的分位数概要合并得到，只传输四分位数、须和离群值"""
+    if '课堂规模' not in cube.sketches:
+        return None
+    stats = cube.box_stats('课堂规模', filter_key)
+    if stats is None:
+        return None
+    fig3 = go.Figure(go.Box(
+        x=['课堂规模'],
+        q1=[stats['q1']],
+        median=[stats['median']],
+        q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']],
+        upperfence=[stats['upperfence']],
+        mean=[stats['mean']],
+        name='课堂规模',
+        boxpoints=False
+    ))
+    outliers = stats['outliers']
+    if not outliers.empty:
+        # 离群值按取值去重，悬停显示该取值的课程数
+        fig3.add_trace(go.Scatter(
+            x=['课堂规模'] * len(outliers),
+            y=outliers['取值'],
+            customdata=outliers['课程数'],
+            mode='markers',
+            name='离群值',
+            hovertemplate='课堂规模 %{y}<br>课程数 %{customdata}<extra></extra>'
+        ))
+    fig3.update_layout(title=f"课堂规模分布（{stats['count']:,} 门课程）", yaxis_title='课堂规模', showlegend=False)
+    return fig3
+
+
+def build_teaching_methods_figure(cube, filter_key):
+    """教学方法实施比例柱状图"""
+    methods_df = cube.teaching_methods(filter_key)
+    if methods_df.empty:
+        return None
+    fig4 = px.bar(
+        methods_df,
+        x='方法',
+        y='实施比例(%)',
+        title='教学方法实施比例',
+        color='实施比例(%)',
+        color_continuous_scale='Teal',
+        text='实施比例(%)'
+    )
+    fig4.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
+    return fig4
+
+
+def build_software_tools_figure(tools_df):
+    """软件工具使用频率柱状图"""
+    fig_tools = px.bar(
+        tools_df,
+        x='软件工具',
+        y='使用课程数',
+        color='状态',
+        title='软件工具使用情况',
+        color_discrete_map={'机房已有': '#10B981', '需补充': '#3B82F6'},
+        text='使用课程数'
+    )
+    fig_tools.update_layout(xaxis_tickangle=-45, height=400)
+    return fig_tools
+
+
+def build_assessment_weights_figure(filtered_df):
+    """考核权重散点图：小数据绘制每门课程，大数据改用 WebGL 或按权重组合分箱，传输的点数有上限"""
+    if '平时权重' not in filtered_df.columns or '期末权重' not in filtered_df.columns:
+        return None
+    labels = {'平时权重': '平时成绩权重(%)', '期末权重': '期末成绩权重(%)'}
+    if len(filtered_df) <= WEIGHT_SCATTER_WEBGL_ROWS:
+        # 创建散点图
+        fig_weight = px.scatter(
+            filtered_df,
+            x='平时权重',
+            y='期末权重',
+            title='考核权重分布',
+            labels=labels,
+            hover_data=['高校名称', '课程名', '学时'],
+            color='学时',
+            size='学时',
+            size_max=20,
+            color_continuous_scale='Viridis',
+            render_mode='svg' if len(filtered_df) <= WEIGHT_SCATTER_EXACT_ROWS else 'webgl'
+        )
+    else:
+        # 服务端二维分箱：每个非空箱一个点，点的大小为课程数，悬停显示汇总信息
+        binned = bin_weight_pairs(filtered_df)
+        fig_weight = px.scatter(
+            binned,
+            x='平时权重',
+            y='期末权重',
+            title=f'考核权重分布（{len(filtered_df):,} 门课程按权重组合汇总）',
+            labels=labels,
+            hover_data={'课程数': ':,', '平均学时': ':.1f'},
+            color='平均学时' if '平均学时' in binned.columns else None,
+            size='课程数',
+            size_max=40,
+            color_continuous_scale='Viridis'
+        )
+
+    # 添加对角线
+    fig_weight.add_shape(
+        type="line",
+        x0=0, y0=100, x1=100, y1=0,
+        line=dict(color="Red", width=2, dash="dash")
+    )
+    return fig_weight
+
+
+def build_assessment_methods_figure(filtered_df, assessment_index):
+    """常见考核方式柱状图：按考核成分统计课程数，悬停显示写明百分比的课程中的平均权重"""
+    methods_df = count_assessment_methods(filtered_df, assessment_index)
+    if methods_df.empty:
+        return None
+
+    fig_methods = px.bar(
+        methods_df,
+        x='考核方式',
+        y='频次',
+        title='常见考核方式',
+        color='频次',
+        color_continuous_scale='RdBu',
+        text='频次',
+        hover_data={'平均权重(%)': ':.1f'} if methods_df['平均权重(%)'].notna().any() else None
+    )
+    fig_methods.update_layout(xaxis_tickangle=-45)
+    return fig_methods
@@ -0,0 +1,105 @@
+"""批量预计算仪表盘的全部汇总结果，输出 JSON / Parquet，适合定时任务调用
+
+    python precompute.py 双一流高校课程开设情况.xlsx --output precomputed
+    python precompute.py data/*.xlsx --sheets "*" --format parquet
+    python precompute.py "surveys/*.xlsx" --output precomputed   # 合并多个工作簿后统一计算
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import DATA_FILE, SHEET_PATTERNS, build_indexes, compute_aggregates, read_source
+
+
+def _json_value(value):
+    """转换为 JSON 可写入的值：numpy 标量转为 Python 数值，NaN 写为 null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _as_frame(aggregate):
+    """字典形式的指标转为单行表，便于统一写入 Parquet"""
+    if isinstance(aggregate, pd.DataFrame):
+        return aggregate
+    return pd.DataFrame([aggregate])
+
+
+def to_json_document(aggregates, source):
+    """全部汇总结果组成的 JSON 文档：表格按记录列表写出"""
+    document = {'source': source, 'generated_at': pd.Timestamp.now().isoformat(timespec='seconds')}
+    for name, aggregate in aggregates.items():
+        if isinstance(aggregate, pd.DataFrame):
+            document[name] = [
+                {str(col): _json_value(value) for col, value in row.items()}
+                for row in aggregate.astype(object).to_dict(orient='records')
+            ]
+        else:
+            document[name] = {key: _json_value(value) for key, value in aggregate.items()}
+    return document
+
+
+def write_aggregates(aggregates, output_dir, formats, source):
+    """写出汇总结果：aggregates.json 和/或每项一个 Parquet 文件，返回写出的路径"""
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    if 'json' in formats:
+        path = os.path.join(output_dir, 'aggregates.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(to_json_document(aggregates, source), f, ensure_ascii=False, indent=2)
+        written.append(path)
+    if 'parquet' in formats:
+        for name, aggregate in aggregates.items():
+            path = os.path.join(output_dir, f'{name}.parquet')
+            frame = _as_frame(aggregate)
+            # 分类列存为普通字符串，避免读取方依赖类别定义
+            frame.astype({col: str for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)}) \
+                .to_parquet(path, index=False)
+            written.append(path)
+    return written
+
+
+def precompute(path, output_dir, formats, sheet_patterns=SHEET_PATTERNS):
+    """读取一个数据源（工作簿、目录或通配模式）并写出其全部汇总结果"""
+    df = read_source(path, sheet_patterns)
+    aggregates = compute_aggregates(df, build_indexes(df))
+    return write_aggregates(aggregates, output_dir, formats, os.path.abspath(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量预计算课程仪表盘的汇总结果')
+    parser.add_argument('workbooks', nargs='*', default=[DATA_FILE],
+                        help='工作簿路径、目录或通配模式（目录和通配模式合并全部工作簿），默认读取 COURSE_DATA_FILE')
+    parser.add_argument('--output', default='precomputed',
+                        help='输出目录；多个工作簿时每个工作簿写入以文件名命名的子目录')
+    parser.add_argument('--format', nargs='+', choices=['json', 'parquet'], default=['json', 'parquet'],
+                        dest='formats', help='输出格式')
+    parser.add_argument('--sheets', default=SHEET_PATTERNS, help='读取的工作表，逗号分隔的通配模式')
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.workbooks:
+        output_dir = args.output
+        if len(args.workbooks) > 1:
+            name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+            output_dir = os.path.join(args.output, ''.join('_' if ch in '*?[]' else ch for ch in name))
+        started = time.perf_counter()
+        try:
+            written = precompute(path, output_dir, args.formats, args.sheets)
+        except Exception as e:
+            print(f"{path}: 处理失败: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{path}: 写出 {len(written)} 个文件到 {output_dir} ({time.perf_counter() - started:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())